@@ -0,0 +1,121 @@
+import os
+
+# Format of the files passed between pipeline stages: "csv" (default) or "parquet" (needs pyarrow)
+ARTIFACT_FORMAT_ENV = "PIPELINE_ARTIFACT_FORMAT"
+ARTIFACT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+# Column types of each artifact. Parquet files are written with these types, so they read back typed;
+# CSV files are written and read exactly as before (e.g. a missing OutputYear stays "n.d.")
+OUTPUT_SCHEMA = {
+    "OutputID": "Int64",
+    "OutputTitle": "string",
+    "OutputBiblio": "string",
+    "OutputVenue": "string",
+    "OutputType": "string",
+    "OutputStatus": "string",
+    "OutputYear": "Int64",
+    "OutputMonth": "string",
+    "OutputVolume": "string",
+    "OutputNumber": "string",
+    "OutputPages": "string",
+}
+PROJECT_SCHEMA = {
+    "ProjID": "string",
+    "ProjectStatus": "string",
+    "ProjectTitle": "string",
+    "ProjectRDC": "string",
+    "ProjectYearStarted": "Int64",
+    "ProjectYearEnded": "Int64",
+    "ProjectPI": "string",
+}
+FILTERED_OUTPUT_SCHEMA = {**PROJECT_SCHEMA, **OUTPUT_SCHEMA}
+AUTHOR_SCHEMA = {"OutputID": "int64", "AuthorPosition": "int64", "Author": "string"}
+
+
+def artifact_format(fmt=None):
+    """
+    The artifact format to use: fmt if given, else $PIPELINE_ARTIFACT_FORMAT, else "csv"
+    """
+    fmt = (fmt or os.environ.get(ARTIFACT_FORMAT_ENV) or "csv").lower()
+    if fmt not in ARTIFACT_EXTENSIONS:
+        raise ValueError(f"Unknown artifact format '{fmt}'; expected one of {', '.join(ARTIFACT_EXTENSIONS)}")
+    return fmt
+
+
+def artifact_path(path, fmt=None):
+    """
+    Gives a .csv or .parquet artifact path the extension of the chosen format; other files are returned unchanged
+    """
+    stem, ext = os.path.splitext(path)
+    if ext not in ARTIFACT_EXTENSIONS.values():
+        return path
+    return stem + ARTIFACT_EXTENSIONS[artifact_format(fmt)]
+
+
+def is_parquet(path):
+    return path.endswith(ARTIFACT_EXTENSIONS["parquet"])
+
+
+def apply_schema(df, schema):
+    """
+    Casts the schema's columns that df has; numbers that do not parse (such as "n.d.") become missing
+    """
+    import pandas as pd
+
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype in ("Int64", "int64"):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def write_table(df, path, schema=None):
+    """
+    Writes df to path as Parquet (typed with schema, zstd-compressed) or CSV, going by the path's extension.
+        In Parquet, object columns outside the schema that mix types (e.g. 5 and "5") are stored as strings
+        """
+    import pandas as pd
+
+    if is_parquet(path):
+        df = apply_schema(df.copy(), schema or {})
+        for column in df.columns:
+            if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna=True) not in ("string", "empty"):
+                df[column] = df[column].astype("string")
+        df.to_parquet(path, index=False, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+
+
+def read_table(path, columns=None, dtype=None, keep_default_na=True):
+    """
+    Reads a Parquet or CSV artifact, loading only the given columns.
+        dtype and keep_default_na only apply to CSV; Parquet columns already have their stored types
+        """
+    import pandas as pd
+
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=dtype, keep_default_na=keep_default_na)
+
+
+def iter_table(path, columns=None, chunksize=100_000, dtype=None):
+    """
+    Yields a Parquet or CSV artifact as DataFrames of up to chunksize rows, reading only the given columns
+        (columns may also be a predicate on the column name)
+        """
+    import pandas as pd
+
+    if not is_parquet(path):
+        yield from pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunksize)
+        return
+
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    if callable(columns):
+        columns = [name for name in parquet_file.schema_arrow.names if columns(name)]
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
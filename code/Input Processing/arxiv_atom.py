@@ -0,0 +1,66 @@
+import re
+import xml.etree.ElementTree as ET
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+
+# arXiv's own DOIs (10.48550/arXiv.<id>) and entry ids (http://arxiv.org/abs/<id>v<version>)
+ARXIV_DOI_PATTERN = re.compile(r"^10\.48550/arxiv\.(.+)$", re.IGNORECASE)
+ENTRY_ID_PATTERN = re.compile(r"/abs/(.+?)(?:v\d+)?$")
+
+
+def iter_entries(source):
+    """
+    Yields each <entry> of an Atom feed as soon as it has been parsed from source (a file-like object,
+        such as a streamed response's raw body). Everything parsed so far is freed once the consumer
+        moves on, so memory stays flat however many entries the feed holds
+        """
+    events = ET.iterparse(source, events=("start", "end"))
+    _, root = next(events)
+    for event, elem in events:
+        if event == "end" and elem.tag == ATOM + "entry":
+            yield elem
+            root.clear()
+
+
+def parse_entry(entry):
+    """
+    Builds a metadata tuple from an arXiv Atom entry
+    """
+    import pandas as pd
+
+    title_elem = entry.find(ATOM + "title")
+    title_api = title_elem.text.strip() if title_elem is not None else ""
+    authors = [a.find(ATOM + "name").text for a in entry.findall(ATOM + "author")]
+    published = entry.find(ATOM + "published")
+    year = int(published.text[:4]) if published is not None else pd.NA
+    month = int(published.text[5:7]) if published is not None else pd.NA
+    doi_elem = entry.find(ARXIV + "doi")
+    doi = doi_elem.text if doi_elem is not None else pd.NA
+    return title_api, authors, year, month, "arXiv", pd.NA, pd.NA, pd.NA, doi, "arxiv"
+
+
+def entry_id(entry):
+    """
+    The versionless arXiv id of an entry, or None for the error entries arXiv sends for unknown ids
+    """
+    id_elem = entry.find(ATOM + "id")
+    match = ENTRY_ID_PATTERN.search(id_elem.text.strip()) if id_elem is not None and id_elem.text else None
+    return match.group(1) if match else None
+
+
+def arxiv_id(doi):
+    """
+    The arXiv id in an arXiv DOI key (see normalization.doi_key), or None for any other DOI
+    """
+    match = ARXIV_DOI_PATTERN.match(doi) if isinstance(doi, str) else None
+    return match.group(1) if match else None
+
+
+def entry_feed(entry):
+    """
+    A one-entry Atom feed holding entry, small enough to cache on its own
+    """
+    feed = ET.Element(ATOM + "feed")
+    feed.append(entry)
+    return ET.tostring(feed, encoding="unicode")
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# How often (seconds) a cancellable RateLimiter.acquire checks its cancel event while waiting for a request slot
+CANCEL_POLL = 0.05
+
+
+class Cancelled(Exception):
+    """
+    Raised by a hedged call that was abandoned because a higher-priority call already has the answer
+    """
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limit plus a concurrency cap for a single upstream API.
+    Thread-safe, so it can guard the blocking requests calls made from worker threads:
+
+        with limiter:
+            r = requests.get(url)
+    """
+
+    def __init__(self, rate, concurrency, burst=None):
+        self.rate = float(rate)                      # tokens added per second
+        self.capacity = float(burst or max(1, rate))  # largest burst allowed
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+    def acquire(self, cancel=None):
+        """
+        Blocks until a request slot and a token are both available and returns True.
+            With a threading.Event as cancel, gives up without taking either and returns False once it is set
+            """
+        while not self.slots.acquire(timeout=None if cancel is None else CANCEL_POLL):
+            if cancel.is_set():
+                return False
+        while True:
+            with self.lock:
+                if cancel is not None and cancel.is_set():
+                    self.slots.release()
+                    return False
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if cancel is None:
+                time.sleep(wait)
+            else:
+                cancel.wait(wait)
+
+    def release(self):
+        self.slots.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def build_limiters(limits):
+    """
+    Builds one RateLimiter per source from a {source: {"rate": ..., "concurrency": ...}} dict
+    """
+    return {source: RateLimiter(cfg["rate"], cfg["concurrency"], cfg.get("burst")) for source, cfg in limits.items()}
+
+
+def run_concurrently(func, items, concurrency, on_result=None):
+    """
+    Runs func(i, item) for every item with up to `concurrency` calls in flight.
+        A fixed pool of asyncio workers pulls items lazily, so memory does not grow with one task per item.
+        Without on_result the results are returned as a list in input order. With on_result,
+        on_result(i, result) is called in input order as results finish and nothing is kept;
+        workers stall rather than let more than 16 * concurrency results wait behind a slow item
+        """
+    source = enumerate(items)
+    results = [] if on_result is None else None
+    window = 16 * concurrency
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        pending = {}
+        next_index = 0
+        progress = asyncio.Condition()
+
+        def emit(i, result):
+            nonlocal next_index
+            pending[i] = result
+            while next_index in pending:
+                ready = pending.pop(next_index)
+                if on_result is None:
+                    results.append(ready)
+                else:
+                    on_result(next_index, ready)
+                next_index += 1
+
+        async def worker():
+            for i, item in source:
+                async with progress:
+                    await progress.wait_for(lambda: i - next_index < window)
+                result = await loop.run_in_executor(executor, func, i, item)
+                async with progress:
+                    emit(i, result)
+                    progress.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        asyncio.run(main())
+
+    return results
+
+
+def hedged_first(calls, delay, executor):
+    """
+    Runs the callables in `calls` (highest priority first) on `executor` and returns
+        the first truthy result in priority order, or None.
+        Each call is passed a threading.Event that is set once the answer is known, so calls still waiting
+        for a rate limiter can give up (see RateLimiter.acquire) rather than spend a request on a dropped result.
+        Each lower-priority call starts once the previous one has come back empty or `delay` seconds
+        after it started, whichever is sooner; delay=0 starts them all at once.
+        Calls that have not started when the answer is known are cancelled;
+        ones already sending a request finish in the background and their results are dropped
+        """
+    futures = []
+    next_launch = None
+    cancel = threading.Event()
+
+    def launch():
+        nonlocal next_launch
+        futures.append(executor.submit(calls[len(futures)], cancel))
+        next_launch = time.monotonic() + delay
+
+    launch()
+    while delay == 0 and len(futures) < len(calls):
+        launch()
+
+    try:
+        while True:
+            # The answer is the first result, in priority order, with every higher-priority call already empty
+            for future in futures:
+                if not future.done():
+                    break
+                if future.result():
+                    return future.result()
+            else:
+                if len(futures) == len(calls):
+                    return None
+                launch()  # Every call so far came back empty, so start the next one now
+                continue
+
+            running = [f for f in futures if not f.done()]
+            if len(futures) < len(calls):
+                timeout = max(0, next_launch - time.monotonic())
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch()
+            else:
+                wait(running, return_when=FIRST_COMPLETED)
+    finally:
+        cancel.set()
+        for future in futures:
+            future.cancel()
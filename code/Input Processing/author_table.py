@@ -0,0 +1,55 @@
+import os
+import sys
+
+# One row per (output, author), in citation order
+AUTHOR_COLUMNS = ["OutputID", "AuthorPosition", "Author"]
+
+
+def author_table_path(output_file):
+    """
+    The author table kept next to an outputs CSV: Group4_Enriched.csv -> Group4_Enriched_Authors.csv
+    """
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}_Authors{ext or '.csv'}"
+
+
+def normalize_author(name):
+    """
+    Collapses runs of whitespace and interns the name, so an author listed on many outputs is one string
+    """
+    return sys.intern(" ".join(str(name).split()))
+
+
+def author_rows(output_id, authors):
+    """
+    (OutputID, AuthorPosition, Author) rows for one output's author list; blank names are dropped
+    """
+    names = [normalize_author(name) for name in authors if isinstance(name, str) and name.strip()]
+    return [(output_id, position, name) for position, name in enumerate(names)]
+
+
+def write_author_table(path, output_ids, author_lists):
+    import pandas as pd
+    from artifacts import AUTHOR_SCHEMA, write_table
+
+    rows = [row for output_id, authors in zip(output_ids, author_lists) for row in author_rows(output_id, authors)]
+    write_table(pd.DataFrame(rows, columns=AUTHOR_COLUMNS), path, AUTHOR_SCHEMA)
+
+
+def read_author_table(path):
+    """
+    Reads an author table (CSV or Parquet) with Author as a categorical column, so each distinct name is held once
+    """
+    from artifacts import read_table
+
+    table = read_table(path, dtype={"OutputID": "int64", "AuthorPosition": "int64", "Author": "category"})
+    table["Author"] = table["Author"].astype("category")
+    return table
+
+
+def author_lists(table):
+    """
+    {OutputID: [authors in citation order]} from an author table
+    """
+    table = table.sort_values(["OutputID", "AuthorPosition"], kind="stable")
+    return table["Author"].astype(object).groupby(table["OutputID"], sort=False).agg(list).to_dict()
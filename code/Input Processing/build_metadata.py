@@ -1,27 +1,92 @@
-def build_project_metadata_dict(file):
+# Where parsed metadata sheets are cached, and the sheet columns each metadata field comes from
+METADATA_CACHE_DIR = ".cache"
+METADATA_FIELDS = {
+    "ProjectStatus": "Status",
+    "ProjectTitle": "Title",
+    "ProjectRDC": "RDC",
+    "ProjectYearStarted": "Start Year",
+    "ProjectYearEnded": "End Year",
+    "ProjectPI": "PI",
+    "Abstract": "Abstract"
+}
+
+
+def file_sha256(file):
+    """
+    Hashes a file's contents in 1 MB blocks
+    """
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_sha256():
+    """
+    Hashes the code that shapes the cached metadata: this module (METADATA_FIELDS) and normalization.py (extract_keywords)
+    """
+    import hashlib
+    import normalization
+
+    digest = hashlib.sha256()
+    for file in (__file__, normalization.__file__):
+        digest.update(file_sha256(file).encode())
+    return digest.hexdigest()
+
+
+def build_project_metadata_dict(file, use_cache=True):
     """
     Builds a dictionary from the All Metadata sheet with ProjID as keys.
-    Each value is a dictionary of project metadata fields.
+    Each value is a dictionary of project metadata fields,
+    including the abstract's keywords so they are only extracted once.
+    The result is pickled under METADATA_CACHE_DIR and reused while the code that builds it is unchanged and
+    the workbook's modification time and size, or failing those its SHA-256, still match.
     """
+    import os
+    import pickle
     import pandas as pd
+    from normalization import extract_keywords
+
+    stat = os.stat(file)
+    cache_file = os.path.join(METADATA_CACHE_DIR, os.path.basename(file) + ".metadata.pkl")
+    cached = None
+    if use_cache and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            cached = None
+    code = code_sha256()
+    if cached and cached.get("code") != code:
+        cached = None
+
+    if cached and (cached["mtime"], cached["size"]) == (stat.st_mtime, stat.st_size):
+        return cached["projects"]
+
+    digest = file_sha256(file)
+    if cached and cached["sha256"] == digest:
+        project_metadata_dict = cached["projects"]
+    else:
+        # Loads only the needed columns of the project metadata file
+        wanted = {"Proj ID", *METADATA_FIELDS.values()}
+        projects_df = pd.read_excel(file, sheet_name="All Metadata", usecols=lambda column: column in wanted)
+        projects_df = projects_df[projects_df["Proj ID"].notna()]
+
+        # Builds the Proj ID keys and the per-project values column-wise
+        proj_ids = projects_df["Proj ID"].astype(int).astype(str).str.zfill(4)
+        records = pd.DataFrame({
+            field: projects_df[column] if column in projects_df.columns else pd.NA
+            for field, column in METADATA_FIELDS.items()
+        }, index=projects_df.index)
+        records["AbstractKeywords"] = records["Abstract"].map(extract_keywords)
+        project_metadata_dict = dict(zip(proj_ids, records.to_dict("records")))
 
-    # Loads the project metadata file
-    projects_df = pd.read_excel(file, sheet_name="All Metadata")
-
-    # Instatiates a dictionary
-    project_metadata_dict = {}
-
-    # Iterates through each row in projects_df and extracts the Proj ID as the key and the project info as a dictionary of values
-    for _, row in projects_df.iterrows():
-        proj_id = f"{int(row['Proj ID']):04d}" if pd.notna(row['Proj ID']) else None
-        if proj_id:
-            project_metadata_dict[proj_id] = {
-                "ProjectStatus": row.get("Status", pd.NA),
-                "ProjectTitle": row.get("Title", pd.NA),
-                "ProjectRDC": row.get("RDC", pd.NA),
-                "ProjectYearStarted": row.get("Start Year", pd.NA),
-                "ProjectYearEnded": row.get("End Year", pd.NA),
-                "ProjectPI": row.get("PI", pd.NA),
-                "Abstract": row.get("Abstract", pd.NA)
-            }
-    return project_metadata_dict
\ No newline at end of file
+    if use_cache:
+        os.makedirs(METADATA_CACHE_DIR, exist_ok=True)
+        with open(cache_file, "wb") as f:
+            pickle.dump({"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest, "code": code,
+                         "projects": project_metadata_dict}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return project_metadata_dict
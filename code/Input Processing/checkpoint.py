@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import os
+
+
+class CheckpointWriter:
+    """
+    Appends finished records straight to a CSV and records each one in a journal
+        (<output_file>.journal) so an interrupted run can resume where it stopped.
+        The journal starts with a fingerprint of the input; a journal written for different input (or without
+        a fingerprint) is discarded and the output started over, so rows of an old input never mix with new ones.
+        Each following line holds the record's input row position and the CSV's byte length after the row was written,
+        so a row that was cut off mid-write is truncated away on restart.
+        With side_file/side_columns, each record may also append rows to a second CSV (such as the author table),
+        which is journaled and truncated the same way
+        """
+
+    def __init__(self, output_file, columns, side_file=None, side_columns=None, fingerprint=None):
+        self.output_file = output_file
+        self.journal_file = output_file + ".journal"
+        self.side_file = side_file
+        self.done = set()
+        self.input_changed = False
+        offset = side_offset = None
+
+        if os.path.exists(self.journal_file) and os.path.exists(output_file) and (not side_file or os.path.exists(side_file)):
+            with open(self.journal_file, encoding="utf-8") as journal:
+                try:
+                    header = json.loads(next(journal, "{}"))
+                except ValueError:
+                    header = {}
+                self.input_changed = fingerprint is None or header.get("fingerprint") != fingerprint
+                for line in journal if not self.input_changed else ():
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Partially written last line
+                    if side_file and "side_offset" not in entry:
+                        break  # Journal from a run without the side file
+                    self.done.add(entry["row"])
+                    offset = entry["offset"]
+                    side_offset = entry.get("side_offset")
+
+        if offset is None:
+            # Nothing usable to resume from: start the output and journal over
+            self.done.clear()
+            with open(output_file, "wb") as f:
+                f.write(self.encode(columns))
+            if side_file:
+                with open(side_file, "wb") as f:
+                    f.write(self.encode(side_columns))
+            with open(self.journal_file, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        else:
+            with open(output_file, "r+b") as f:
+                f.truncate(offset)
+            if side_file:
+                with open(side_file, "r+b") as f:
+                    f.truncate(side_offset)
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(self.journal_length())
+
+        self.resumed = len(self.done)
+        self.csv = open(output_file, "ab")
+        self.side_csv = open(side_file, "ab") if side_file else None
+        self.journal = open(self.journal_file, "a", encoding="utf-8")
+
+    def journal_length(self):
+        """
+        Byte length of the journal up to its last complete line
+        """
+        with open(self.journal_file, "rb") as f:
+            data = f.read()
+        return data.rfind(b"\n") + 1
+
+    @staticmethod
+    def encode(values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue().encode("utf-8")
+
+    def is_done(self, row):
+        """
+        True if the record for this input row position was written by an earlier run
+        """
+        return row in self.done
+
+    def write(self, row, values, side_rows=()):
+        self.csv.write(self.encode(values))
+        self.csv.flush()
+        entry = {"row": row, "offset": self.csv.tell()}
+        if self.side_csv:
+            for row in side_rows:
+                self.side_csv.write(self.encode(row))
+            self.side_csv.flush()
+            entry["side_offset"] = self.side_csv.tell()
+        self.journal.write(json.dumps(entry) + "\n")
+        self.journal.flush()
+
+    def close(self):
+        self.csv.close()
+        if self.side_csv:
+            self.side_csv.close()
+        self.journal.close()
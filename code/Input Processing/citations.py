@@ -0,0 +1,197 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# Matches month numbers to names
+MONTH_LOOKUP = {
+    1: "January", 2: "February", 3: "March", 4: "April",
+    5: "May", 6: "June", 7: "July", 8: "August",
+    9: "September", 10: "October", 11: "November", 12: "December"
+}
+
+
+def format_author(name):
+    """
+    Formats each individual name in APA format
+    """
+    parts = name.strip().split()
+    if len(parts) == 1:
+        return parts[0]
+    last = parts[-1]
+    initials = [p[0] + "." for p in parts[:-1] if p]
+    return f"{last}, {' '.join(initials)}"
+
+
+def format_apa_authors(authors):
+    """
+    Creates a formatted list of author names to fit APA format: Last Name, First Initial
+    """
+    formatted = [format_author(name) for name in authors if name]
+    if len(formatted) == 0:
+        return ""
+    elif len(formatted) == 1:
+        return formatted[0]
+    elif len(formatted) == 2:
+        return f"{formatted[0]} & {formatted[1]}"
+    else:
+        return ", ".join(formatted[:-1]) + ", & " + formatted[-1]
+
+
+def make_apa_citation(authors, year, title, journal, volume, issue, pages, doi, source):
+    """
+    Makes APA citations from components extracted
+    """
+    authors_str = format_apa_authors(authors)
+    year_str = str(year) if pd.notna(year) else "n.d."
+
+    if isinstance(source, str) and source.lower() == "arxiv" and isinstance(doi, str) and "arxiv" in doi.lower():
+        arxiv_id = doi.split("/")[-1]
+        citation = f"{authors_str} ({year_str}). \"{title}\" (arXiv:{arxiv_id}). *arXiv*."
+    elif isinstance(source, str) and "ssrn" in str(doi).lower():
+        citation = f"{authors_str} ({year_str}). \"{title}\". *SSRN Working Paper Series*."
+    elif isinstance(source, str) and "nber" in str(doi).lower():
+        citation = f"{authors_str} ({year_str}). \"{title}\". *NBER Working Paper Series*."
+    else:
+        citation = f"{authors_str} ({year_str}). \"{title}\""
+        if pd.notna(journal):
+            citation += f". *{journal}*"
+        if pd.notna(volume):
+            citation += f", {volume}"
+        if pd.notna(issue):
+            citation += f"({issue})"
+        if pd.notna(pages):
+            citation += f", {pages}"
+        citation += "."
+
+    if isinstance(doi, str) and "doi.org" in doi:
+        citation += f" {doi.strip()}"
+    elif isinstance(doi, str) and doi.startswith("10."):
+        citation += f" https://doi.org/{doi.strip()}"
+
+    return citation
+
+
+def month_number_to_name(month):
+    """
+    Changes month numbers to names
+    """
+    try:
+        if pd.isna(month):
+            return pd.NA
+        return MONTH_LOOKUP.get(int(month), pd.NA)
+    except:
+        return pd.NA
+
+
+def year_string(year):
+    return str(year) if pd.notna(year) else "n.d."
+
+
+# Column-wise versions of the functions above, producing identical strings for a whole batch of records at once.
+# They work on pandas string columns, so concatenation and selection run in Arrow when pyarrow is installed
+
+def text_column(values):
+    """
+    The str values of a column, with every non-str value (None, NaN, numbers) missing
+    """
+    values = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        values = values.where(values.map(type) == str)
+    return values.astype("string")
+
+
+def str_column(values):
+    """
+    str() of every value, as an f-string would show it (None -> "None", pd.NA -> "<NA>")
+    """
+    values = pd.Series(values, dtype=object)
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind in ("string", "empty"):
+        strings = values.astype("string")
+    elif kind == "integer":
+        # Whole numbers such as years repeat a lot: each distinct one goes through str() once
+        codes, distinct = pd.factorize(values)
+        strings = pd.Series(np.array([str(value) for value in distinct] + [pd.NA], dtype=object)[codes],
+                            index=values.index, dtype="string")
+    else:
+        return values.map(str).astype("string")
+    missing = values.isna()
+    return strings.where(~missing, values[missing].map(str))
+
+
+def format_apa_authors_column(author_lists):
+    """
+    format_apa_authors for a column of author lists. The names are exploded into one column and dictionary-encoded,
+        so each distinct author is formatted once however many outputs list them; the names are then joined back
+        per record with the APA separators
+        """
+    lengths = np.fromiter(map(len, author_lists), dtype=np.int64, count=len(author_lists))
+    names = np.fromiter(chain.from_iterable(author_lists), dtype=object, count=lengths.sum())
+    records = np.repeat(np.arange(len(author_lists)), lengths)
+    keep = pd.notna(names) & (names != "")
+    names, records = names[keep], records[keep]
+    codes, distinct = pd.factorize(names)
+    formatted = np.array([format_author(name) for name in distinct], dtype=object)[codes]
+
+    # Separators: none before the first name, " & " before the second of two, ", & " before the last of three or more
+    counts = np.bincount(records, minlength=len(author_lists))
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(records)) - starts[records]
+    count = counts[records]
+    separators = np.select(
+        [position == 0, (position == count - 1) & (count == 2), position == count - 1],
+        ["", " & ", ", & "],
+        default=", ",
+    ).astype(object)
+
+    joined = np.full(len(author_lists), "", dtype=object)
+    if len(records):
+        listed = counts > 0
+        joined[listed] = np.add.reduceat(separators + formatted, starts[listed])
+    return pd.Series(joined, dtype="string")
+
+
+def year_string_column(years):
+    years = pd.Series(years, dtype=object)
+    return str_column(years).where(years.notna(), "n.d.")
+
+
+def month_name_column(months):
+    """
+    month_number_to_name for a column; only the distinct values go through the scalar version
+    """
+    codes, uniques = pd.factorize(pd.Series(months, dtype=object), use_na_sentinel=True)
+    names = np.array([month_number_to_name(month) for month in uniques] + [pd.NA], dtype=object)
+    return names[codes]
+
+
+def apa_citation_column(authors, years, titles, journals, volumes, issues, pages, dois, sources):
+    """
+    make_apa_citation for whole columns of record fields; returns a string Series of citations
+    """
+    def optional(values, before, after=""):
+        values = pd.Series(values, dtype=object)
+        return (before + str_column(values) + after).where(values.notna(), "")
+
+    def flag(values):
+        return values.fillna(False).astype(bool)
+
+    doi = text_column(dois)
+    doi_lower = doi.str.lower()
+    has_source = text_column(sources).notna()
+    is_arxiv = flag(text_column(sources).str.lower() == "arxiv") & flag(doi_lower.str.contains("arxiv", regex=False))
+    is_ssrn = has_source & flag(doi_lower.str.contains("ssrn", regex=False))
+    is_nber = has_source & flag(doi_lower.str.contains("nber", regex=False))
+
+    citation = format_apa_authors_column(authors) + " (" + year_string_column(years) + "). \"" + str_column(titles) + "\""
+    body = optional(journals, ". *", "*") + optional(volumes, ", ") + optional(issues, "(", ")") + optional(pages, ", ") + "."
+    body = body.mask(is_nber, ". *NBER Working Paper Series*.")
+    body = body.mask(is_ssrn, ". *SSRN Working Paper Series*.")
+    body = body.mask(is_arxiv, " (arXiv:" + doi.str.replace(r"(?s)^.*/", "", regex=True) + "). *arXiv*.")
+
+    stripped_doi = doi.str.strip()
+    link = pd.Series("", index=doi.index, dtype="string")
+    link = link.mask(flag(doi.str.startswith("10.")), " https://doi.org/" + stripped_doi)
+    link = link.mask(flag(doi.str.contains("doi.org", regex=False)), " " + stripped_doi)
+    return citation + body + link
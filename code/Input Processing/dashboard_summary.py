@@ -0,0 +1,147 @@
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+
+from artifacts import iter_table
+from author_table import author_table_path
+
+# The only columns the dashboard reads
+SUMMARY_COLUMNS = ["ProjectRDC", "OutputYear", "OutputBiblio", "OutputType", "ProjectTitle"]
+SUMMARY_CHUNK_SIZE = 100_000
+# How many authors and projects the JSON summary lists
+SUMMARY_TOP_N = 50
+
+# The author list at the start of an APA citation, before "(YYYY"
+CITATION_AUTHORS_PATTERN = r"^(.*?)\s+\(\d{4}|^n\.d\.\)"
+
+
+def citation_authors(biblios):
+    """
+    Pulls the authors out of a column of APA citations as one exploded Series of "First Last" names
+    """
+    authors = biblios.str.extract(CITATION_AUTHORS_PATTERN, expand=False).dropna()
+    authors = authors.str.split(" & ").explode().str.strip()
+    authors = authors[authors.notna() & (authors != "")]
+
+    # "Last, First" -> "First Last"
+    parts = authors.str.split(", ")
+    flipped = parts.str[1] + " " + parts.str[0]
+    return authors.where(parts.str.len() != 2, flipped)
+
+
+class DashboardSummary:
+    """
+    Every count the dashboard shows, gathered in one pass over the research outputs.
+        Feed it chunks with update(); each chunk is counted column by column and then dropped
+        """
+
+    def __init__(self):
+        self.total_outputs = 0
+        self.rdcs = Counter()
+        self.years = Counter()
+        self.authors = Counter()
+        self.output_types = Counter()
+        self.projects = Counter()
+
+    @classmethod
+    def from_frame(cls, df):
+        summary = cls()
+        summary.update(df)
+        return summary
+
+    @classmethod
+    def from_table(cls, file_path, authors_file=None, chunksize=SUMMARY_CHUNK_SIZE):
+        """
+        Builds the summary by streaming the CSV or Parquet file in chunks, reading only the columns it needs.
+            Authors are counted from the author table (by default the one next to file_path) when it exists,
+            and parsed out of the citations otherwise
+            """
+        authors_file = authors_file or author_table_path(file_path)
+        use_table = os.path.exists(authors_file)
+
+        wanted = [column for column in SUMMARY_COLUMNS if not (use_table and column == "OutputBiblio")]
+
+        summary = cls()
+        for chunk in iter_table(file_path, lambda column: column in wanted, chunksize, dtype=str):
+            summary.update(chunk)
+        if use_table:
+            for chunk in iter_table(authors_file, ["Author"], chunksize, dtype=str):
+                summary.count(summary.authors, chunk["Author"])
+        return summary
+
+    @staticmethod
+    def count(counter, values):
+        counter.update(values.value_counts(sort=False).to_dict())
+
+    def update(self, chunk):
+        """
+        Adds one chunk of rows. Counts are taken in order of first appearance, so ties break the same way
+            value_counts does on the whole table
+            """
+        count = self.count
+        self.total_outputs += len(chunk)
+        if "ProjectRDC" in chunk:
+            count(self.rdcs, chunk["ProjectRDC"])
+        if "OutputYear" in chunk:
+            count(self.years, pd.to_numeric(chunk["OutputYear"], errors="coerce").dropna().astype(int))
+        if "OutputBiblio" in chunk:
+            count(self.authors, citation_authors(chunk["OutputBiblio"]))
+        if "OutputType" in chunk:
+            count(self.output_types, chunk["OutputType"])
+        if "ProjectTitle" in chunk:
+            count(self.projects, chunk["ProjectTitle"])
+
+    def rdc_counts(self):
+        """
+        Top 10 RDCs by number of outputs, smallest first (for a horizontal bar chart)
+        """
+        counts = pd.Series(self.rdcs, dtype="int64").sort_index()
+        return counts.sort_values(ascending=False).head(10).sort_values()
+
+    def year_counts(self):
+        return pd.Series(self.years, dtype="int64").sort_index()
+
+    def author_counts(self):
+        """
+        Top 10 authors by number of outputs, smallest first
+        """
+        return pd.Series(dict(self.authors.most_common(10)), dtype="int64").sort_values()
+
+    def output_type_counts(self):
+        return pd.Series(dict(self.output_types.most_common()), dtype="int64")
+
+    def project_counts(self, top_n=10, min_pubs=1):
+        """
+        The top_n projects with at least min_pubs outputs, as a ProjectTitle / PublicationCount frame
+        """
+        pc = pd.Series(self.projects, dtype="int64").sort_index().rename("PublicationCount")
+        pc = pc.rename_axis("ProjectTitle").reset_index()
+        filt = pc[pc["PublicationCount"] >= min_pubs]
+        return filt.sort_values("PublicationCount", ascending=False).head(top_n).reset_index(drop=True)
+
+    def to_dict(self, top_n=SUMMARY_TOP_N):
+        """
+        A compact JSON-ready view: full RDC, year, and type counts, and the top_n authors and projects
+        """
+        def pairs(counter, n=None):
+            return [[key, int(value)] for key, value in counter.most_common(n)]
+
+        return {
+            "total_outputs": self.total_outputs,
+            "distinct_rdcs": len(self.rdcs),
+            "distinct_authors": len(self.authors),
+            "distinct_projects": len(self.projects),
+            "first_year": min(self.years, default=None),
+            "last_year": max(self.years, default=None),
+            "rdcs": pairs(self.rdcs),
+            "years": sorted([int(year), int(count)] for year, count in self.years.items()),
+            "output_types": pairs(self.output_types),
+            "top_authors": pairs(self.authors, top_n),
+            "top_projects": pairs(self.projects, top_n),
+        }
+
+    def write_json(self, path, top_n=SUMMARY_TOP_N):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(top_n), f, default=int)
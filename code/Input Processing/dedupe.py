@@ -0,0 +1,255 @@
+from array import array
+
+import numpy as np
+
+from normalization import doi_key, normalize_title, number_tokens
+
+# Titles whose estimated Jaccard similarity (over 4-byte shingles of the normalized title) reaches this are duplicates
+DUPLICATE_THRESHOLD = 0.8
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands of 4 rows: pairs from about 0.5 similarity up become candidates
+SHINGLE_SIZE = 4  # Bytes per shingle; the signature code packs exactly four
+
+# Mersenne prime for the (a * x + b) mod p permutations; shingles are 32-bit, so a * x fits in 64 bits
+MERSENNE_PRIME = (1 << 31) - 1
+
+# The bucket table doubles before more than this share of its slots is used
+BUCKET_LOAD = 2 / 3
+# Multiplier of the FNV-style hash that turns each band of a signature into a 64-bit bucket key
+BAND_HASH_PRIME = np.uint64(0x100000001B3)
+
+
+class BucketTable:
+    """
+    The LSH buckets of every band in one open-addressing table of two flat arrays: a 64-bit bucket key -> the number
+        of the distinct title that opened the bucket. A slot takes 12 bytes and the table doubles before more than
+        BUCKET_LOAD of its slots are used, so once it has grown a bucket costs 18 to 36 bytes. Key 0 marks an empty slot
+        """
+
+    def __init__(self, bits=10):
+        self.bits = bits
+        self.keys = array("Q", bytes(8 << bits))
+        self.values = array("i", bytes(4 << bits))
+        self.count = 0
+
+    def slot(self, key):
+        """
+        The slot holding key, or the empty slot its probe ends on (the key's top bits pick the first slot)
+        """
+        keys, mask = self.keys, (1 << self.bits) - 1
+        slot = key >> (64 - self.bits)
+        while keys[slot] != key and keys[slot]:
+            slot = (slot + 1) & mask
+        return slot
+
+    def lookup(self, keys):
+        """
+        The slot of each key and the value stored under it (None for a key with no bucket yet)
+        """
+        table, values, mask, shift = self.keys, self.values, (1 << self.bits) - 1, 64 - self.bits
+        slots, found = [], []
+        for key in keys:
+            slot = key >> shift
+            while table[slot] != key and table[slot]:
+                slot = (slot + 1) & mask
+            slots.append(slot)
+            found.append(values[slot] if table[slot] else None)
+        return slots, found
+
+    def open(self, keys, slots, value):
+        """
+        Stores value under each of keys that has no bucket yet, given the slots lookup found for them
+        """
+        for key, slot in zip(keys, slots):
+            if self.keys[slot] == key:
+                continue
+            if self.keys[slot]:
+                # Taken by one of the keys opened just before
+                slot = self.slot(key)
+                if self.keys[slot] == key:
+                    continue
+            self.keys[slot], self.values[slot] = key, value
+            self.count += 1
+        if self.count > BUCKET_LOAD * len(self.keys):
+            self.grow()
+
+    def grow(self):
+        """
+        Doubles the table. Every key is placed again at once: each round, the first key waiting on each
+            free slot takes it and the others move one slot along
+            """
+        old_keys = np.frombuffer(self.keys, dtype=np.uint64)
+        used = old_keys != 0
+        keys, values = old_keys[used], np.frombuffer(self.values, dtype=np.int32)[used]
+        self.bits += 1
+        self.keys, self.values = array("Q", bytes(8 << self.bits)), array("i", bytes(4 << self.bits))
+        table, table_values = np.frombuffer(self.keys, dtype=np.uint64), np.frombuffer(self.values, dtype=np.int32)
+
+        mask = (1 << self.bits) - 1
+        slots = (keys >> np.uint64(64 - self.bits)).astype(np.int64)
+        waiting = np.arange(len(keys))
+        while len(waiting):
+            free = np.flatnonzero(table[slots[waiting]] == 0)
+            _, first = np.unique(slots[waiting[free]], return_index=True)
+            placed = waiting[free[first]]
+            table[slots[placed]], table_values[slots[placed]] = keys[placed], values[placed]
+            left = np.ones(len(waiting), dtype=bool)
+            left[free[first]] = False
+            waiting = waiting[left]
+            slots[waiting] = (slots[waiting] + 1) & mask
+
+
+class NearDuplicateIndex:
+    """
+    Groups titles that are the same up to punctuation, quotes, spacing, or small edits, and records that share a DOI.
+        Records are added one at a time and each is compared only with the clusters it shares an LSH bucket with,
+        so adding n titles takes close to linear time. Records with different DOIs are never merged on title alone,
+        and neither are similar titles whose numbers differ ("2010 census" and "2020 census", "part i" and "part ii").
+        Every cluster's canonical representative is its earliest record.
+        Memory: on top of its normalized title and union-find entry, each distinct title keeps its signature as
+        4 * num_perm bytes of one bytearray, an 8-byte record id, a reference to its numbers, and one BucketTable
+        slot per band (18 to 36 bytes each): 0.55 to 0.85 KB with the defaults. A duplicate keeps only its title
+        and union-find entry
+        """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.threshold = threshold
+        self.bands = bands
+
+        self.parent = []  # Union-find over record ids
+        self.by_title = {}  # Normalized title -> record id
+        self.by_doi = {}  # DOI key -> record id
+        self.buckets = BucketTable()  # Band key -> number of the distinct title that opened the bucket
+        # Distinct titles (those that opened LSH buckets), numbered in the order they were added
+        self.signatures = bytearray()  # Their MinHash signatures, back to back
+        self.distinct_records = array("q")  # Their record ids
+        self.numbers = []  # The numbers in their titles
+        self.dois = {}  # Cluster root -> DOI key, if the cluster has one
+
+    def __len__(self):
+        return len(self.parent)
+
+    def signature(self, title):
+        """
+        MinHash signature of the title's overlapping 4-byte shingles, each packed into one 32-bit number
+            (repeated shingles are left in; they do not change the minimum)
+            """
+        data = np.frombuffer(title.encode("utf-8").ljust(SHINGLE_SIZE, b"\0"), dtype=np.uint8).astype(np.uint64)
+        shingles = data[:-3] << 24 | data[1:-2] << 16 | data[2:-1] << 8 | data[3:]
+        return ((self.a * shingles + self.b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature):
+        """
+        The BucketTable key of each band of a signature: a hash of the band number and its slice of the signature.
+            Keys that collide only cost a wasted comparison, since each candidate's whole signature is checked
+            """
+        keys = np.arange(1, self.bands + 1, dtype=np.uint64)
+        rows = signature.reshape(self.bands, -1)
+        # Bands of an even number of rows are read as 64-bit words, so each step of the hash takes in two values
+        rows = rows.view(np.uint64) if rows.shape[1] % 2 == 0 else rows.astype(np.uint64)
+        for column in rows.T:
+            keys = (keys ^ column) * BAND_HASH_PRIME
+        return [key or 1 for key in keys.tolist()]
+
+    def distinct_signature(self, number):
+        size = self.a.size * 4
+        return np.frombuffer(self.signatures[number * size:(number + 1) * size], dtype=np.uint32)
+
+    def find(self, record):
+        root = record
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[record] != root:
+            self.parent[record], record = root, self.parent[record]
+        return root
+
+    def union(self, a, b):
+        """
+        Merges two clusters; the earlier root stays the representative
+        """
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        a, b = min(a, b), max(a, b)
+        self.parent[b] = a
+        if b in self.dois:
+            self.dois.setdefault(a, self.dois.pop(b))
+        return a
+
+    def add(self, title, doi=None):
+        """
+        Adds a record and returns the canonical record id of its cluster at this point;
+            a return value equal to len(self) - 1 means the record started a new cluster
+            """
+        record = len(self.parent)
+        self.parent.append(record)
+        doi = doi_key(doi)
+        key = normalize_title(title)
+
+        root = record
+        if doi is not None and doi in self.by_doi:
+            root = self.union(self.by_doi[doi], record)
+
+        title_root = self.match_title(key, doi)
+        if title_root is not None:
+            root = self.union(title_root, root)
+
+        if doi is not None:
+            self.by_doi.setdefault(doi, record)
+            self.dois.setdefault(root, doi)
+        return root
+
+    def match_title(self, key, doi):
+        """
+        Finds the cluster an identical or similar title belongs to, registering the title if it starts one
+        """
+        def compatible(root):
+            other = self.dois.get(self.find(root))
+            return doi is None or other is None or other == doi
+
+        record = len(self.parent) - 1
+        if key in self.by_title:
+            root = self.find(self.by_title[key])
+            return root if compatible(root) else None
+        self.by_title[key] = record
+
+        signature, numbers = self.signature(key), number_tokens(key)
+        band_keys = self.band_keys(signature)
+        slots, openers = self.buckets.lookup(band_keys)
+        match = None
+        # Each title that opened one of the buckets, in band order
+        for opener in dict.fromkeys(opener for opener in openers if opener is not None):
+            # Compare with the title that opened the bucket, but merge into its cluster's current root
+            candidate = self.distinct_records[opener]
+            if (compatible(candidate) and self.numbers[opener] == numbers
+                    and np.mean(self.distinct_signature(opener) == signature) >= self.threshold):
+                match = self.find(candidate)
+                break
+        if match is None:
+            # A new distinct title: later titles are compared against it. Buckets already opened keep their opener
+            number = len(self.distinct_records)
+            self.signatures += signature.tobytes()
+            self.distinct_records.append(record)
+            self.numbers.append(numbers)
+            self.buckets.open(band_keys, slots, number)
+        return match
+
+    def canonical_mask(self):
+        """
+        Boolean array marking the canonical record of every cluster
+        """
+        return np.array([self.find(record) == record for record in range(len(self.parent))], dtype=bool)
+
+    def clusters(self):
+        """
+        {canonical record id: [record ids in the cluster]} for clusters with more than one record
+        """
+        groups = {}
+        for record in range(len(self.parent)):
+            groups.setdefault(self.find(record), []).append(record)
+        return {root: members for root, members in groups.items() if len(members) > 1}
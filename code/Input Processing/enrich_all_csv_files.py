@@ -1,29 +1,151 @@
-def enrich_csv(df, output_file):
+# Upstream endpoints, kept at module level so a run can be pointed at a mock server
+OPENALEX_URL = "https://api.openalex.org"
+CROSSREF_URL = "https://api.crossref.org"
+ARXIV_URL = "https://export.arxiv.org/api"
+
+# Requests per second and simultaneous connections allowed for each upstream
+API_LIMITS = {
+    "OpenAlex": {"rate": 10, "concurrency": 10},
+    "CrossRef": {"rate": 10, "concurrency": 5},
+    "arXiv": {"rate": 1 / 3, "concurrency": 1},  # arXiv asks for one request every 3 seconds
+}
+
+# Number of DOIs resolved per request in the DOI pre-pass
+DOI_BATCH_SIZE = 50
+# Number of arXiv ids per id_list request; the response is parsed as it streams in, so this does not bound memory
+ARXIV_BATCH_SIZE = 200
+
+# Rows handled per chunk: DOIs are resolved one chunk at a time so memory stays flat on large inputs
+CHUNK_SIZE = 5000
+
+# Where API responses are cached between runs
+DEFAULT_CACHE_PATH = ".cache/api_responses.sqlite"
+
+# Where titles resolved by earlier runs, and by local output tables, are indexed (see title_index.py)
+DEFAULT_TITLE_INDEX_PATH = ".cache/title_index.sqlite"
+
+# Output columns an API may leave out; in Parquet an empty one is stored as missing, whichever way the run wrote it
+OPTIONAL_COLUMNS = ["OutputVenue", "OutputMonth", "OutputVolume", "OutputNumber", "OutputPages"]
+
+
+def enrich_csv(df, output_file, concurrency=None, cache_path=DEFAULT_CACHE_PATH, checkpoint=False, hedge_delay=None,
+               title_index_path=DEFAULT_TITLE_INDEX_PATH, local_sources=(), prometheus_path=None, input_fingerprint=None):
+    """
+    Enriches each title in df with metadata from OpenAlex, CrossRef, and arXiv and writes it to output_file.
+        df may also be an iterable of DataFrame chunks ("title" and optional "doi" columns), which is consumed
+        lazily, so the input never has to be in memory all at once; rows are numbered across chunks.
+        With concurrency=None titles are searched one at a time;
+        with concurrency=N up to N titles are searched at once, subject to the per-API limits in API_LIMITS.
+        Rows with a known DOI are resolved in batches first and skip the title search.
+        With hedge_delay set, the fallback APIs are queried hedge_delay seconds after the previous one
+        instead of waiting for it to fail (0 queries all three at once); OpenAlex > CrossRef > arXiv still decides the answer.
+        API responses are cached in cache_path (None disables the cache).
+        Before any API is searched, a title is looked up in the local title index at title_index_path
+        (None disables it), which holds every title resolved by earlier runs plus the outputs in the
+        local_sources tables (e.g. 2024 ResearchOutput.xlsx); near-identical titles match too.
+        With checkpoint=True each record is appended to output_file as soon as it is done and a rerun
+        skips the titles already written; nothing is kept in memory and None is returned.
+        A Parquet output_file is checkpointed to <stem>.checkpoint.csv, which is converted and removed once every title is done.
+        A rerun only resumes if the input is the same: input_fingerprint identifies it (for a DataFrame it defaults
+        to a hash of its contents); a chunk iterable without one, or with a different one, is enriched from scratch.
+        Each output gets an OutputID; its authors are written to the author table next to output_file
+        (see author_table.py) rather than into the CSV.
+        Request counts, latencies, and status codes per API, and which source answered each title, are written
+        as a JSON summary next to output_file (see enrichment_metrics.py), and to prometheus_path as a Prometheus
+        text file if it is given.
+        output_file may be .csv or .parquet (see artifacts.py)
+        """
+    import hashlib
+    import io
+    import os
     import pandas as pd
-    import re
     import time
-    import requests
-    import xml.etree.ElementTree as ET
-
-    # Fixes the spacing of the titles in the file
-    df["title"] = df["title"].astype(str).str.replace('\n', ' ').str.replace('\r', ' ').str.replace(r'\s+', ' ', regex=True).str.strip()
+    from urllib.parse import quote
+    from concurrent.futures import ThreadPoolExecutor
+    from async_enrichment import Cancelled, build_limiters, hedged_first, run_concurrently
+    from response_cache import ResponseCache
+    from http_session import SessionPool
+    from checkpoint import CheckpointWriter
+    from title_index import TitleIndex
+    from enrichment_metrics import EnrichmentMetrics, metrics_path
+    from arxiv_atom import arxiv_id, entry_feed, entry_id, iter_entries, parse_entry
+    from normalization import clean_titles, doi_key, normalize_title
+    from citations import apa_citation_column, make_apa_citation, month_name_column, month_number_to_name, year_string, year_string_column
+    from author_table import AUTHOR_COLUMNS, author_rows, author_table_path, write_author_table
+    from artifacts import AUTHOR_SCHEMA, OUTPUT_SCHEMA, read_table, write_table
+    from output_classification import classify_outputs, infer_output_status, infer_output_type
+
+    # A single DataFrame is just one chunk; the total is only known up front in that case
+    chunks = [df] if isinstance(df, pd.DataFrame) else df
+    total = f" of {len(df)}" if isinstance(df, pd.DataFrame) else ""
 
     # Prepare containers for metadata
-    output_years, output_months = [], []
-    output_venues, output_volumes = [], []
-    output_numbers, output_pages = [], []
-    output_biblios, output_authors = [], []
-    output_titles = []
-
-    def normalize_title(title):
+    columns = ["OutputID", "OutputTitle", "OutputBiblio", "OutputVenue", "OutputType", "OutputStatus",
+               "OutputYear", "OutputMonth", "OutputVolume", "OutputNumber", "OutputPages"]
+    # Authors are collected too but go to the author table instead of the CSV; DOI and Source are only used for the citation
+    output_columns = {column: [] for column in columns + ["Authors", "DOI", "Source"]}
+    authors_file = author_table_path(output_file)
+    resolved_dois = {}
+
+    limiters = build_limiters(API_LIMITS)
+    metrics = EnrichmentMetrics()
+    cache = ResponseCache(cache_path) if cache_path else None
+    title_index = TitleIndex(title_index_path) if title_index_path else None
+    for source_file in local_sources if title_index else ():
+        if os.path.exists(source_file):
+            added = title_index.add_output_table(source_file)
+            if added:
+                print(f"Indexed {added} titles from {source_file}")
+    session = SessionPool(pool_size=max(cfg["concurrency"] for cfg in API_LIMITS.values()))
+    hedge_pool = ThreadPoolExecutor(max_workers=3 * (concurrency or 1)) if hedge_delay is not None else None
+
+    def timed_get(source, url, cancel=None, **kwargs):
         """
-        Normalizes the title for search to ensure matches are found
+        Sends a GET request through the shared session once the source's rate limiter allows it,
+            recording the wait, the latency, and the status code.
+            Raises Cancelled instead if the hedge event cancel is set before the request is sent
+            """
+        queued = time.monotonic()
+        # acquire gives up if cancel is set while it waits; a call cancelled just after getting through sends nothing either
+        if not limiters[source].acquire(cancel):
+            raise Cancelled
+        try:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled
+            sent = time.monotonic()
+            try:
+                r = session.get(url, **kwargs)
+            except Exception:
+                metrics.record_request(source, "error", time.monotonic() - sent, sent - queued)
+                raise
+        finally:
+            limiters[source].release()
+        metrics.record_request(source, r.status_code, time.monotonic() - sent, sent - queued)
+        return r
+
+    def http_get(source, endpoint, query, url, is_miss=None, cancel=None):
         """
-        title = str(title).lower()
-        title = re.sub(r"[’‘“”]", "'", title)  # Normalize quotes
-        title = re.sub(r"[^\w\s]", "", title)  # Remove punctuation
-        title = re.sub(r"\s+", " ", title)     # Remove extra whitespace
-        return title.strip()
+        Returns the cached response for (endpoint, query) if there is one,
+            otherwise sends a GET request through the shared session once the source's rate limiter allows it
+            and caches the answer.
+            is_miss tells apart a successful response that found nothing, which is cached as a negative entry;
+            cancel is the hedge event passed on to timed_get
+            """
+        if cache:
+            cached = cache.get(endpoint, query)
+            if cached is not None:
+                metrics.record_cache_hit(source)
+                return cached
+
+        r = timed_get(source, url, cancel)
+
+        if cache and r.status_code in (200, 404):
+            try:
+                negative = r.status_code == 404 or bool(is_miss and is_miss(r))
+                cache.put(endpoint, query, r.status_code, r.text, negative)
+            except ValueError:
+                pass  # Unparseable body, leave it uncached
+        return r
 
     def normalize_doi(doi):
         """
@@ -33,52 +155,59 @@ def enrich_csv(df, output_file):
             return doi.replace("https://doi.org/", "").strip()
         return doi
 
-    def search_openalex(norm_title):
+    def parse_openalex_work(data, resolve_journal=True, cancel=None):
         """
-        Searches OpenAlex for the first result when a title is searched
-            Falls back on CrossRef DOI search if the journal is missing from OpenAlex
+        Builds a metadata tuple from an OpenAlex work
+            Falls back on CrossRef DOI search if the journal is missing from OpenAlex and resolve_journal is set
             """
+        doi = data.get("doi")
+        if not doi or not isinstance(doi, str) or not doi.startswith("https://doi.org/"):
+            doi = pd.NA
+
+        host_venue = data.get("host_venue", {})
+        journal = host_venue.get("display_name")
+
+        # Fallback to CrossRef if journal is missing and DOI is usable
+        if resolve_journal and (journal is None or pd.isna(journal)) and isinstance(doi, str):
+            fallback = search_crossref_doi(doi, cancel)
+            if fallback:
+                _, _, _, _, fallback_journal, *_ = fallback
+                journal = fallback_journal
+
+        title = data.get("title", "").strip()
+        authors = [a.get("author", {}).get("display_name", "") for a in data.get("authorships", [])]
+        year = data.get("publication_year", pd.NA)
+        month = int(data.get("publication_date", "0000-00-00")[5:7]) if data.get("publication_date") else pd.NA
+        volume = data.get("biblio", {}).get("volume", pd.NA)
+        issue = data.get("biblio", {}).get("issue", pd.NA)
+        pages = data.get("biblio", {}).get("first_page", pd.NA)
+
+        return title, authors, year, month, journal, volume, issue, pages, doi, "OpenAlex"
+
+    def search_openalex(norm_title, cancel=None):
+        """
+        Searches OpenAlex for the first result when a title is searched
+        """
         try:
             query = "+".join(norm_title.split())
-            r = requests.get(f"https://api.openalex.org/works?search={query}&per-page=1")
+            r = http_get("OpenAlex", "openalex/search", norm_title, f"{OPENALEX_URL}/works?search={query}&per-page=1",
+                         is_miss=lambda resp: not resp.json().get("results"), cancel=cancel)
             if r.status_code == 200:
                 results = r.json().get("results", [])
                 if results:
-                    data = results[0]
-
-                    doi = data.get("doi")
-                    if not doi or not isinstance(doi, str) or not doi.startswith("https://doi.org/"):
-                        doi = pd.NA
-
-                    host_venue = data.get("host_venue", {})
-                    journal = host_venue.get("display_name")
-
-                    # Fallback to CrossRef if journal is missing and DOI is usable
-                    if (journal is None or pd.isna(journal)) and isinstance(doi, str):
-                        fallback = search_crossref_doi(doi)
-                        if fallback:
-                            _, _, _, fallback_journal, *_ = fallback
-                            journal = fallback_journal
-
-                    title = data.get("title", "").strip()
-                    authors = [a.get("author", {}).get("display_name", "") for a in data.get("authorships", [])]
-                    year = data.get("publication_year", pd.NA)
-                    month = int(data.get("publication_date", "0000-00-00")[5:7]) if data.get("publication_date") else pd.NA
-                    volume = data.get("biblio", {}).get("volume", pd.NA)
-                    issue = data.get("biblio", {}).get("issue", pd.NA)
-                    pages = data.get("biblio", {}).get("first_page", pd.NA)
-
-                    return title, authors, year, month, journal, volume, issue, pages, doi, "OpenAlex"
+                    return parse_openalex_work(results[0], cancel=cancel)
+        except Cancelled:
+            return None
         except Exception as e:
             print(f"OpenAlex title search failed for '{norm_title}': {e}")
 
-    def search_crossref_doi(doi):
+    def search_crossref_doi(doi, cancel=None):
         """
         Searches CrossRef using DOI as a fallback for OpenAlex Title Search
         """
         doi = normalize_doi(doi)
         try:
-            r = requests.get(f"https://api.crossref.org/works/{doi}")
+            r = http_get("CrossRef", "crossref/doi", doi, f"{CROSSREF_URL}/works/{doi}", cancel=cancel)
             if r.status_code == 200:
                 data = r.json().get("message", {})
                 title_api = data.get("title", [""])[0].strip() if "title" in data else ""
@@ -89,68 +218,192 @@ def enrich_csv(df, output_file):
                         if name: authors.append(name)
                 journal = data.get("container-title", [pd.NA])[0] if data.get("container-title") else pd.NA
                 return title_api, authors, None, None, journal, None, None, None, doi, "CrossRef"
+        except Cancelled:
+            raise
         except Exception as e:
             print(f"CrossRef DOI lookup failed for {doi}: {e}")
 
         return None
 
-    def search_crossref(norm_title):
+    def parse_crossref_item(data):
+        """
+        Builds a metadata tuple from a CrossRef work item
+        """
+        title_api = data.get("title", [""])[0].strip() if "title" in data else ""
+        authors = [f"{a.get('given', '')} {a.get('family', '')}".strip() for a in data.get("author", [])]
+        year = data.get("issued", {}).get("date-parts", [[pd.NA]])[0][0]
+        month = data.get("issued", {}).get("date-parts", [[pd.NA, pd.NA]])[0][1] if len(data.get("issued", {}).get("date-parts", [[pd.NA]])[0]) > 1 else pd.NA
+        journal = data.get("container-title", [pd.NA])[0]
+        volume = data.get("volume", pd.NA)
+        issue = data.get("issue", pd.NA)
+        pages = data.get("page", pd.NA)
+        doi = data.get("DOI", pd.NA)
+        return title_api, authors, year, month, journal, volume, issue, pages, doi, "CrossRef"
+
+    def search_crossref(norm_title, cancel=None):
         """
         Searches CrossRef for the first result when a title is searched
         """
         try:
             query = "+".join(norm_title.split())
-            r = requests.get(f"https://api.crossref.org/works?query.title={query}&rows=1")
+            r = http_get("CrossRef", "crossref/title", norm_title, f"{CROSSREF_URL}/works?query.title={query}&rows=1",
+                         is_miss=lambda resp: not resp.json()["message"].get("items"), cancel=cancel)
             if r.status_code == 200:
                 items = r.json()["message"].get("items", [])
                 if items:
-                    data = items[0]
-                    title_api = data.get("title", [""])[0].strip() if "title" in data else ""
-                    authors = [f"{a.get('given', '')} {a.get('family', '')}".strip() for a in data.get("author", [])]
-                    year = data.get("issued", {}).get("date-parts", [[pd.NA]])[0][0]
-                    month = data.get("issued", {}).get("date-parts", [[pd.NA, pd.NA]])[0][1] if len(data.get("issued", {}).get("date-parts", [[pd.NA]])[0]) > 1 else pd.NA
-                    journal = data.get("container-title", [pd.NA])[0]
-                    volume = data.get("volume", pd.NA)
-                    issue = data.get("issue", pd.NA)
-                    pages = data.get("page", pd.NA)
-                    doi = data.get("DOI", pd.NA)
-                    return title_api, authors, year, month, journal, volume, issue, pages, doi, "CrossRef"
+                    return parse_crossref_item(items[0])
+        except Cancelled:
+            return None
         except Exception as e:
             print(f"CrossRef title search failed for '{norm_title}': {e}")
 
-    def search_arxiv(norm_title):
+    def search_arxiv(norm_title, cancel=None):
         """
         Searches arXiv for the first result when a title is searched
         """
         try:
             query = "+".join(norm_title.split())
-            r = requests.get(f"https://export.arxiv.org/api/query?search_query=ti:{query}&max_results=1")
+            r = http_get("arXiv", "arxiv/title", norm_title, f"{ARXIV_URL}/query?search_query=ti:{query}&max_results=1",
+                         is_miss=lambda resp: "<entry>" not in resp.text, cancel=cancel)
             if r.status_code == 200:
-                root = ET.fromstring(r.text)
-                entries = root.findall("{http://www.w3.org/2005/Atom}entry")
-                if entries:
-                    entry = entries[0]
-                    title_elem = entry.find("{http://www.w3.org/2005/Atom}title")
-                    title_api = title_elem.text.strip() if title_elem is not None else ""
-                    authors = [
-                        a.find("{http://www.w3.org/2005/Atom}name").text
-                        for a in entry.findall("{http://www.w3.org/2005/Atom}author")
-                    ]
-                    published = entry.find("{http://www.w3.org/2005/Atom}published")
-                    year = int(published.text[:4]) if published is not None else pd.NA
-                    month = int(published.text[5:7]) if published is not None else pd.NA
-                    doi_elem = entry.find("{http://arxiv.org/schemas/atom}doi")
-                    doi = doi_elem.text if doi_elem is not None else pd.NA
-                    return title_api, authors, year, month, "arXiv", pd.NA, pd.NA, pd.NA, doi, "arxiv"
+                for entry in iter_entries(io.StringIO(r.text)):
+                    return parse_entry(entry)
+        except Cancelled:
+            return None
         except Exception as e:
             print(f"arXiv fallback failed for '{norm_title}': {e}")
 
+    def resolve_openalex_dois(dois):
+        """
+        Looks up one batch of DOIs with a single OpenAlex filter=doi:a|b|... request
+        """
+        found = {}
+        try:
+            query = "|".join(dois)
+            r = http_get("OpenAlex", "openalex/doi-batch", query,
+                         f"{OPENALEX_URL}/works?filter=doi:{quote(query, safe='/:|')}&per-page={len(dois)}",
+                         is_miss=lambda resp: not resp.json().get("results"))
+            if r.status_code == 200:
+                for data in r.json().get("results", []):
+                    key = doi_key(data.get("doi"))
+                    if key:
+                        found[key] = parse_openalex_work(data, resolve_journal=False)
+        except Exception as e:
+            print(f"OpenAlex DOI batch lookup failed for {len(dois)} DOIs: {e}")
+        return found
+
+    def resolve_crossref_dois(dois):
+        """
+        Looks up one batch of DOIs with a single CrossRef filter=doi:a,doi:b,... request
+        """
+        found = {}
+        try:
+            query = ",".join(f"doi:{doi}" for doi in dois)
+            r = http_get("CrossRef", "crossref/doi-batch", query,
+                         f"{CROSSREF_URL}/works?filter={quote(query, safe='/:,')}&rows={len(dois)}",
+                         is_miss=lambda resp: not resp.json()["message"].get("items"))
+            if r.status_code == 200:
+                for data in r.json()["message"].get("items", []):
+                    key = doi_key(data.get("DOI"))
+                    if key:
+                        found[key] = parse_crossref_item(data)
+        except Exception as e:
+            print(f"CrossRef DOI batch lookup failed for {len(dois)} DOIs: {e}")
+        return found
+
+    def resolve_arxiv_ids(ids):
+        """
+        Looks up one batch of arXiv ids with a single id_list request, parsing the Atom feed entry by entry
+            as the response streams in. Entries are cached one at a time, so ids seen before are not requested again
+            """
+        found, wanted = {}, []
+        for key in ids:
+            cached = cache.get("arxiv/id", key) if cache else None
+            if cached is None:
+                wanted.append(key)
+            else:
+                metrics.record_cache_hit("arXiv")
+                if cached.status_code == 200:
+                    found[key] = parse_entry(next(iter_entries(io.StringIO(cached.text))))
+        if not wanted:
+            return found
+
+        try:
+            r = timed_get("arXiv", f"{ARXIV_URL}/query?id_list={','.join(wanted)}&max_results={len(wanted)}", stream=True)
+            try:
+                if r.status_code == 200:
+                    r.raw.decode_content = True
+                    for entry in iter_entries(r.raw):
+                        key = (entry_id(entry) or "").lower()
+                        if key in wanted:
+                            found[key] = parse_entry(entry)
+                            if cache:
+                                cache.put("arxiv/id", key, 200, entry_feed(entry))
+                    if cache:
+                        for key in wanted:
+                            if key not in found:
+                                cache.put("arxiv/id", key, 404, "", negative=True)
+            finally:
+                r.close()
+        except Exception as e:
+            print(f"arXiv id batch lookup failed for {len(wanted)} ids: {e}")
+        return found
+
+    def resolve_dois(dois):
+        """
+        Resolves every known DOI in batches of DOI_BATCH_SIZE before any title search:
+            OpenAlex first, then CrossRef for the DOIs OpenAlex lacks or has no journal for,
+            then arXiv itself for arXiv DOIs (10.48550/arXiv.<id>) neither of them knows.
+            Returns a dict of DOI key -> metadata tuple
+            """
+        # Commas and pipes are the batch separators, so those DOIs go through the title search instead
+        keys = [k for k in dict.fromkeys(doi_key(d) for d in dois) if k and "," not in k and "|" not in k]
+        if not keys:
+            return {}
+
+        def run_batches(resolver, keys, batch_size=DOI_BATCH_SIZE):
+            batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+            if concurrency:
+                results = run_concurrently(lambda _, batch: resolver(batch), batches, concurrency)
+            else:
+                results = [resolver(batch) for batch in batches]
+            merged = {}
+            for found in results:
+                merged.update(found)
+            return merged
+
+        resolved = run_batches(resolve_openalex_dois, keys)
+        no_journal = [k for k, result in resolved.items() if result[4] is None or pd.isna(result[4])]
+        leftovers = [k for k in keys if k not in resolved]
+        crossref = run_batches(resolve_crossref_dois, leftovers + no_journal)
+
+        for k in no_journal:
+            if k in crossref:
+                resolved[k] = resolved[k][:4] + (crossref[k][4],) + resolved[k][5:]
+        for k in leftovers:
+            if k in crossref:
+                resolved[k] = crossref[k]
+
+        preprints = {arxiv_id(k): k for k in keys if k not in resolved and arxiv_id(k)}
+        if preprints:
+            found = run_batches(resolve_arxiv_ids, list(preprints), ARXIV_BATCH_SIZE)
+            for key, result in found.items():
+                resolved[preprints[key]] = result
+
+        print(f"Resolved {len(resolved)} of {len(keys)} DOIs in batches")
+        return resolved
+
     def sequential_api_search(doi, norm_title):
         """
         Enacts a pipeline in which, for each title, OpenAlex (and CrossRef DOI) is searched
             followed by CrossRef title search
             and finally arXiv title search
+            In hedged mode the later searches start early, but the answer follows the same order
             """
+        if hedge_pool:
+            return hedged_first([lambda cancel, search=search: search(norm_title, cancel)
+                                 for search in (search_openalex, search_crossref, search_arxiv)], hedge_delay, hedge_pool)
+
         result = search_openalex(norm_title)
         if result:
             return result
@@ -167,184 +420,184 @@ def enrich_csv(df, output_file):
 
     def get_metadata(title, doi=None):
         """
-        Enriches the data by searching the 3 APIs: OpenAlex, CrossRef, and arXiv
-        """
-        norm_title = normalize_title(title)
-        result = sequential_api_search(doi, norm_title)
+        Enriches the data from the batch-resolved DOIs, the local title index,
+            or else by searching the 3 APIs: OpenAlex, CrossRef, and arXiv
+                    """
+        result, route = resolved_dois.get(doi_key(doi)), "doi_batch"
+        if not result:
+            norm_title = normalize_title(title)
+            result, route = (title_index.lookup(norm_title, doi) if title_index else None), "title_index"
+            if not result:
+                result, route = sequential_api_search(doi, norm_title), "search"
+                if result and title_index:
+                    title_index.add(norm_title, result)
+        metrics.record_title(route if result else "unmatched", source_name(result[9]) if result else "none")
         if result:
             title_api, authors, year, month, journal, volume, issue, pages, doi, source = result
         else:
             title_api, authors, year, month, journal, volume, issue, pages, doi, source = "", [], pd.NA, pd.NA, pd.NA, pd.NA, pd.NA, pd.NA, pd.NA, pd.NA
         return title_api, authors, year, month, journal, volume, issue, pages, doi, source
 
-    def format_apa_authors(authors):
+    def source_name(source):
         """
-        Creates a formatted list of author names to fit APA format: Last Name, First Initial
+        The API_LIMITS name of a record's source ("arxiv" -> "arXiv"); other sources, such as local tables, as they are
         """
-        def format_one(name):
-            """
-            Formats each individual name in APA format
-            """
-            parts = name.strip().split()
-            if len(parts) == 1:
-                return parts[0]
-            last = parts[-1]
-            initials = [p[0] + "." for p in parts[:-1] if p]
-            return f"{last}, {' '.join(initials)}"
-
-        formatted = [format_one(name) for name in authors if name]
-        if len(formatted) == 0:
-            return ""
-        elif len(formatted) == 1:
-            return formatted[0]
-        elif len(formatted) == 2:
-            return f"{formatted[0]} & {formatted[1]}"
-        else:
-            return ", ".join(formatted[:-1]) + ", & " + formatted[-1]
+        return next((name for name in API_LIMITS if name.lower() == str(source).lower()), str(source))
 
-    def make_apa_citation(authors, year, title, journal, volume, issue, pages, doi, source):
+    def enrich_row(_, row):
         """
-        Makes APA citations from components extracted
+        Searches the APIs for one (index, title, doi) row and builds its unformatted output record
         """
-        authors_str = format_apa_authors(authors)
-        year_str = str(year) if pd.notna(year) else "n.d."
-
-        if isinstance(source, str) and source.lower() == "arxiv" and isinstance(doi, str) and "arxiv" in doi.lower():
-            arxiv_id = doi.split("/")[-1]
-            citation = f"{authors_str} ({year_str}). \"{title}\" (arXiv:{arxiv_id}). *arXiv*."
-        elif isinstance(source, str) and "ssrn" in str(doi).lower():
-            citation = f"{authors_str} ({year_str}). \"{title}\". *SSRN Working Paper Series*."
-        elif isinstance(source, str) and "nber" in str(doi).lower():
-            citation = f"{authors_str} ({year_str}). \"{title}\". *NBER Working Paper Series*."
-        else:
-            citation = f"{authors_str} ({year_str}). \"{title}\""
-            if pd.notna(journal):
-                citation += f". *{journal}*"
-            if pd.notna(volume):
-                citation += f", {volume}"
-            if pd.notna(issue):
-                citation += f"({issue})"
-            if pd.notna(pages):
-                citation += f", {pages}"
-            citation += "."
-
-        if isinstance(doi, str) and "doi.org" in doi:
-            citation += f" {doi.strip()}"
-        elif isinstance(doi, str) and doi.startswith("10."):
-            citation += f" https://doi.org/{doi.strip()}"
-
-        return citation
-
-    # Matches month numbers to names
-    month_lookup = {
-        1: "January", 2: "February", 3: "March", 4: "April",
-        5: "May", 6: "June", 7: "July", 8: "August",
-        9: "September", 10: "October", 11: "November", 12: "December"
-    }
-
-    def month_number_to_name(month):
-        """
-        Changes month numbers to names
-        """
-        try:
-            if pd.isna(month):
-                return pd.NA
-            return month_lookup.get(int(month), pd.NA)
-        except:
-            return pd.NA
-
-    """Iterates through each title and adds the metadata to lists"""
-    for idx, row in df.iterrows():
-        title = row.get("title")
-        doi = row.get("doi")
-        print(f"Searching ({idx + 1} of {len(df)}): {title}")
+        i, title, doi = row
+        print(f"Searching ({i + 1}{total}): {title}")
 
         title_api, authors, year, month, journal, volume, issue, pages, doi, source = get_metadata(title, doi)
-        time.sleep(0.5)
-
-        citation = make_apa_citation(authors, year, title_api, journal, volume, issue, pages, doi, source)
-        year_str = str(year) if pd.notna(year) else "n.d."
-
-        output_titles.append(title_api)
-        output_biblios.append(citation)
-        output_authors.append(authors)
-        output_years.append(year_str)
-        output_months.append(month_number_to_name(month))
-        output_venues.append(journal)
-        output_volumes.append(volume)
-        output_numbers.append(issue)
-        output_pages.append(pages)
-
-    def infer_output_type(row):
-        """
-        Uses OutputBiblio and OutputVenue to determine the OutputType
-        """
-        citation = str(row.get("OutputBiblio", "")).lower()
-        venue = str(row.get("OutputVenue", "")).lower()
-
-        type_keywords = {
-            "WP": ["arxiv", "ssrn", "nber", "mimeo", "working paper", "white paper", "technical report", "preprint", "discussion paper"],
-            "JA": ["journal", "review", "letters", "transactions", "proceedings", "bulletin", "chaos", "fractals", "economic", "science", "statistics"],
-            "MI": ["media", "interview", "press release", "news"],
-            "BC": ["book chapter", "in ", "edited volume"],
-            "BK": ["book", "monograph"],
-            "RE": ["report", "census report", "annual report"],
-            "TN": ["technical note"],
-            "DI": ["dissertation", "thesis"],
-            "SW": ["software", "codebase", "repository", "github"],
-            "MT": ["multimedia", "video", "podcast"],
-            "DS": ["dataset", "data release"],
-            "BG": ["blog", "opinion", "column", "newsletter"]
+        # The citation, year, and month name are formatted later (see citations.py), a whole batch at once
+        return i, {
+            "OutputID": i,
+            "OutputTitle": title_api,
+            "Authors": authors,
+            "OutputVenue": journal,
+            "OutputYear": year,
+            "OutputMonth": month,
+            "OutputVolume": volume,
+            "OutputNumber": issue,
+            "OutputPages": pages,
+            "DOI": doi,
+            "Source": source,
         }
 
-        if "*" in citation and re.search(r"\d{4}\)\. \"(.*?)\"\.* \*.*?\*", citation):
-            return "JA"
-
-        for type_code, keywords in type_keywords.items():
-            if any(keyword in citation or keyword in venue for keyword in keywords):
-                return type_code
-
-        return "WP"  # assume WP if uncertain
+    def blank_to_missing(table):
+        """
+        Marks the empty optional fields of a finished table as missing. The checkpoint CSV cannot tell "" from a
+            missing value, so both modes store them the same way
+            """
+        for column in OPTIONAL_COLUMNS:
+            values = table[column].astype(object)
+            table[column] = values.where(values != "", pd.NA)
+        return table
 
-    def infer_output_status(row):
+    def csv_value(value):
         """
-        Uses OutputVenue, OutputType, and OutputBiblio to determine OutputStatus
+        Formats a value the way DataFrame.to_csv would
         """
-        output_type = row.get("OutputType", "")
-        venue = str(row.get("OutputVenue", "")).lower()
-        citation = str(row.get("OutputBiblio", "")).lower()
-
-        if venue.strip() == "":
-            return "UP"
-
-        wp_keywords = ["working paper", "white paper", "technical report", "arxiv", "ssrn", "nber", "mimeo", "preprint", "discussion paper", "conference"]
-        if any(word in citation for word in wp_keywords):
-            return "UP"
-
-        journal_keywords = ["journal", "review", "letters", "transactions", "proceedings", "bulletin", "matematika", "economic", "statistics"]
-        if output_type == "JA" and any(j in venue for j in journal_keywords):
-            return "PB"
+        return "" if value is None or pd.isna(value) else value
 
-        if output_type == "WP":
-            return "UP"
-
-        return "PB"
+    def collect(_, result):
+        """
+        Adds a finished record to the metadata lists
+        """
+        _, record = result
+        for column, value in record.items():
+            output_columns[column].append(value)
 
+    def write_checkpoint(_, result):
+        """
+        Formats and classifies a finished record and appends it to the output file
+        """
+        row, record = result
+        record["OutputBiblio"] = make_apa_citation(record["Authors"], record["OutputYear"], record["OutputTitle"], record["OutputVenue"],
+                                                   record["OutputVolume"], record["OutputNumber"], record["OutputPages"], record["DOI"], record["Source"])
+        record["OutputYear"] = year_string(record["OutputYear"])
+        record["OutputMonth"] = month_number_to_name(record["OutputMonth"])
+        record["OutputType"] = infer_output_type(record)
+        record["OutputStatus"] = infer_output_status(record)
+        writer.write(row, [csv_value(record[column]) for column in columns], author_rows(record["OutputID"], record["Authors"]))
+
+    # Checkpoints are appended to a CSV; a Parquet output is converted from a scratch CSV once every title is done.
+    # The scratch file is not <stem>.csv, which may be the CSV artifact of the same stage
+    checkpoint_file = output_file if output_file.endswith(".csv") else os.path.splitext(output_file)[0] + ".checkpoint.csv"
+    if checkpoint and input_fingerprint is None and isinstance(df, pd.DataFrame):
+        input_fingerprint = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+                                           + repr(list(df.columns)).encode("utf-8")).hexdigest()
+    writer = CheckpointWriter(checkpoint_file, columns, author_table_path(checkpoint_file), AUTHOR_COLUMNS,
+                              fingerprint=input_fingerprint) if checkpoint else None
+    emit = write_checkpoint if checkpoint else collect
+    if writer and writer.input_changed:
+        print(f"The input is not the one {checkpoint_file} was written from; enriching from scratch")
+    if writer and writer.resumed:
+        print(f"Resuming: {writer.resumed} titles already written to {checkpoint_file}")
+
+    def pending_rows():
+        """
+        Yields (index, title, doi) for every row not already written by an earlier checkpointed run
+        """
+        i = 0
+        for chunk in chunks:
+            chunk["title"] = clean_titles(chunk["title"])
+            dois = chunk["doi"] if "doi" in chunk.columns else [None] * len(chunk)
+            for title, doi in zip(chunk["title"], dois):
+                if not (writer and writer.is_done(i)):
+                    yield i, title, doi
+                i += 1
+
+    def chunked(rows):
+        """
+        Groups rows into lists of CHUNK_SIZE
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    """Iterates through the titles one chunk at a time and adds the metadata to lists or the output file"""
+    for chunk in chunked(pending_rows()):
+        resolved_dois = resolve_dois([doi for _, _, doi in chunk])
+        if concurrency:
+            run_concurrently(enrich_row, chunk, concurrency, on_result=emit)
+        else:
+            # No pause between titles: every request already waits for its API's rate limiter
+            for row in chunk:
+                emit(None, enrich_row(None, row))
+
+    if hedge_pool:
+        hedge_pool.shutdown(wait=True)
+    session.close()
+    if cache:
+        print(f"API response cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+    if title_index:
+        print(f"Title index: {title_index.exact_hits} exact and {title_index.fuzzy_hits} fuzzy matches, {title_index.misses} misses")
+        title_index.close()
+    metrics.stop()
+    metrics.report()
+    metrics.write(metrics_path(output_file), prometheus_path)
+
+    if writer:
+        writer.close()
+        if checkpoint_file != output_file:
+            # Read as text so values such as volume "1" are not turned into 1.0 before the schema is applied,
+            # and without NA parsing, so an empty title stays "" and a title such as "None" stays text
+            table = read_table(checkpoint_file, dtype=str, keep_default_na=False)
+            write_table(blank_to_missing(table), output_file, OUTPUT_SCHEMA)
+            authors = read_table(author_table_path(checkpoint_file), dtype=str, keep_default_na=False)
+            write_table(authors, authors_file, AUTHOR_SCHEMA)
+            for scratch in (checkpoint_file, author_table_path(checkpoint_file), writer.journal_file):
+                os.remove(scratch)
+        return None
     """Adds all of the information to an enriched DataFrame"""
     enriched_df = pd.DataFrame()
-    enriched_df["OutputTitle"] = output_titles
-    enriched_df["Authors"] = output_authors
-    enriched_df["OutputBiblio"] = output_biblios
-    enriched_df["OutputVenue"] = output_venues
-    enriched_df["OutputType"] = enriched_df.apply(infer_output_type, axis=1)
-    enriched_df["OutputStatus"] = enriched_df.apply(infer_output_status, axis=1)
-    enriched_df["OutputYear"] = output_years
-    enriched_df["OutputMonth"] = output_months
-    enriched_df["OutputVolume"] = output_volumes
-    enriched_df["OutputNumber"] = output_numbers
-    enriched_df["OutputPages"] = output_pages
-
-    # Creates a CSV file from the enriched DataFrame
-    enriched_df.to_csv(output_file, index=False)
+    enriched_df["OutputID"] = output_columns["OutputID"]
+    enriched_df["OutputTitle"] = output_columns["OutputTitle"]
+    enriched_df["OutputBiblio"] = apa_citation_column(
+        output_columns["Authors"], output_columns["OutputYear"], output_columns["OutputTitle"], output_columns["OutputVenue"],
+        output_columns["OutputVolume"], output_columns["OutputNumber"], output_columns["OutputPages"],
+        output_columns["DOI"], output_columns["Source"])
+    enriched_df["OutputVenue"] = output_columns["OutputVenue"]
+    enriched_df["OutputType"], enriched_df["OutputStatus"] = classify_outputs(enriched_df["OutputBiblio"], enriched_df["OutputVenue"])
+    enriched_df["OutputYear"] = year_string_column(output_columns["OutputYear"])
+    enriched_df["OutputMonth"] = month_name_column(output_columns["OutputMonth"])
+    enriched_df["OutputVolume"] = output_columns["OutputVolume"]
+    enriched_df["OutputNumber"] = output_columns["OutputNumber"]
+    enriched_df["OutputPages"] = output_columns["OutputPages"]
+    blank_to_missing(enriched_df)
+
+    # Writes the enriched DataFrame, and the author table beside it
+    write_table(enriched_df, output_file, OUTPUT_SCHEMA)
+    write_author_table(authors_file, output_columns["OutputID"], output_columns["Authors"])
 
     return enriched_df
\ No newline at end of file
@@ -0,0 +1,210 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Environment variable naming a Prometheus text file for the enrich stage to write its metrics to
+PROMETHEUS_FILE_ENV = "ENRICH_METRICS_PROMETHEUS"
+
+# Upper bounds (seconds) of the request latency histogram exported to Prometheus
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+# Percentiles are read from a finer log-spaced histogram whose bucket edges grow by this ratio (about 5% error)
+PERCENTILE_RATIO = 1.05
+PERCENTILE_FLOOR = 0.001
+PERCENTILES = [50, 90, 95, 99]
+
+
+def metrics_path(output_file):
+    """
+    The JSON metrics summary that goes next to an enriched output file: Group4_Enriched.csv -> Group4_Enriched_Metrics.json
+    """
+    return os.path.splitext(output_file)[0] + "_Metrics.json"
+
+
+class LatencyHistogram:
+    """
+    Request latencies of one source, kept as bucket counts so memory does not grow with the number of requests
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.fine = Counter()
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.fine[max(0, math.ceil(math.log(max(seconds, PERCENTILE_FLOOR) / PERCENTILE_FLOOR, PERCENTILE_RATIO)))] += 1
+
+    def percentile(self, p):
+        """
+        The upper edge of the fine bucket holding the p-th percentile latency, or None before any request
+        """
+        if not self.count:
+            return None
+        rank, seen = math.ceil(self.count * p / 100), 0
+        for index in sorted(self.fine):
+            seen += self.fine[index]
+            if seen >= rank:
+                return PERCENTILE_FLOOR * PERCENTILE_RATIO ** index
+        return None
+
+
+class EnrichmentMetrics:
+    """
+    Counts what an enrichment run spends its time on: requests, latencies, and status codes per API,
+        time spent waiting on the rate limiters, cache hits, and which route and source each title's answer came from.
+        Thread-safe, so the concurrent searches can all report into one instance
+        """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stopped = None
+        self.titles = 0
+        self.requests = defaultdict(Counter)  # source -> status code (or "error") -> count
+        self.latency = defaultdict(LatencyHistogram)
+        self.throttled = defaultdict(float)  # source -> seconds spent waiting for the rate limiter
+        self.cache_hits = Counter()
+        self.matches = defaultdict(Counter)  # route -> source -> count
+
+    def record_request(self, source, status, seconds, waited=0.0):
+        """
+        One request sent to source: its final status code (after retries) or "error", how long it took,
+            and how long it waited for the rate limiter first
+            """
+        with self.lock:
+            self.requests[source][status] += 1
+            self.latency[source].add(seconds)
+            self.throttled[source] += waited
+
+    def record_cache_hit(self, source):
+        with self.lock:
+            self.cache_hits[source] += 1
+
+    def record_title(self, route, source):
+        """
+        One finished title: the route that answered it ("doi_batch", "title_index", "search", or "unmatched")
+            and the source of the record
+            """
+        with self.lock:
+            self.titles += 1
+            self.matches[route][source] += 1
+
+    def stop(self):
+        """
+        Ends the run's clock; throughput is measured up to here
+        """
+        self.stopped = time.monotonic()
+
+    def summary(self):
+        """
+        All of the metrics as a JSON-ready dict
+        """
+        with self.lock:
+            elapsed = (self.stopped or time.monotonic()) - self.started
+            matched = sum(sum(sources.values()) for route, sources in self.matches.items() if route != "unmatched")
+            wins = Counter()
+            for route, sources in self.matches.items():
+                if route != "unmatched":
+                    wins.update(sources)
+
+            sources = {}
+            for source in sorted(set(self.requests) | set(self.cache_hits)):
+                latency = self.latency[source]
+                sources[source] = {
+                    "requests": sum(self.requests[source].values()),
+                    "status_codes": {str(status): count for status, count in sorted(self.requests[source].items(), key=str)},
+                    "cache_hits": self.cache_hits[source],
+                    "latency_seconds": {
+                        "mean": round(latency.total / latency.count, 4) if latency.count else None,
+                        **{f"p{p}": round(latency.percentile(p), 4) if latency.count else None for p in PERCENTILES},
+                    },
+                    "throttle_wait_seconds": round(self.throttled[source], 3),
+                }
+
+            return {
+                "titles": self.titles,
+                "elapsed_seconds": round(elapsed, 3),
+                "titles_per_second": round(self.titles / elapsed, 3) if elapsed > 0 else None,
+                "matched": matched,
+                "match_share": {source: round(count / matched, 4) for source, count in wins.most_common()} if matched else {},
+                "matches_by_route": {route: dict(sources) for route, sources in sorted(self.matches.items())},
+                "sources": sources,
+            }
+
+    def prometheus(self):
+        """
+        The metrics in the Prometheus text exposition format, for node_exporter's textfile collector
+        """
+        def labels(**values):
+            return "{" + ",".join(f'{name}="{str(value)}"' for name, value in values.items()) + "}"
+
+        summary = self.summary()
+        lines = [
+            "# HELP enrichment_titles_total Titles enriched in the last run",
+            "# TYPE enrichment_titles_total counter",
+            f"enrichment_titles_total {summary['titles']}",
+            "# HELP enrichment_titles_per_second Throughput of the last run",
+            "# TYPE enrichment_titles_per_second gauge",
+            f"enrichment_titles_per_second {summary['titles_per_second'] or 0}",
+            "# HELP enrichment_matches_total Titles by the route and source that answered them",
+            "# TYPE enrichment_matches_total counter",
+        ]
+        with self.lock:
+            for route, sources in sorted(self.matches.items()):
+                lines += [f"enrichment_matches_total{labels(route=route, source=source)} {count}" for source, count in sorted(sources.items())]
+            lines += ["# HELP enrichment_requests_total API requests by source and final status code",
+                      "# TYPE enrichment_requests_total counter"]
+            for source, statuses in sorted(self.requests.items()):
+                lines += [f"enrichment_requests_total{labels(source=source, status=status)} {count}"
+                          for status, count in sorted(statuses.items(), key=str)]
+            lines += ["# HELP enrichment_request_duration_seconds API request latency, retries included",
+                      "# TYPE enrichment_request_duration_seconds histogram"]
+            for source, latency in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], latency.buckets):
+                    cumulative += count
+                    lines.append(f"enrichment_request_duration_seconds_bucket{labels(source=source, le=bound)} {cumulative}")
+                lines.append(f"enrichment_request_duration_seconds_sum{labels(source=source)} {latency.total}")
+                lines.append(f"enrichment_request_duration_seconds_count{labels(source=source)} {latency.count}")
+            lines += ["# HELP enrichment_throttle_wait_seconds_total Time spent waiting for each source's rate limiter",
+                      "# TYPE enrichment_throttle_wait_seconds_total counter"]
+            lines += [f"enrichment_throttle_wait_seconds_total{labels(source=source)} {seconds}" for source, seconds in sorted(self.throttled.items())]
+            lines += ["# HELP enrichment_cache_hits_total Responses served from the API response cache",
+                      "# TYPE enrichment_cache_hits_total counter"]
+            lines += [f"enrichment_cache_hits_total{labels(source=source)} {count}" for source, count in sorted(self.cache_hits.items())]
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """
+        One line per source for the run log
+        """
+        summary = self.summary()
+        print(f"Enriched {summary['titles']} titles in {summary['elapsed_seconds']:.1f}s ({summary['titles_per_second'] or 0:.2f} titles/s)")
+        for source, stats in summary["sources"].items():
+            latency = stats["latency_seconds"]
+            timing = f", p50 {latency['p50']:.3f}s, p95 {latency['p95']:.3f}s" if stats["requests"] else ""
+            share = summary["match_share"].get(source, 0)
+            print(f"  {source}: {stats['requests']} requests{timing}, {stats['cache_hits']} cache hits, "
+                  f"{stats['throttle_wait_seconds']:.1f}s throttled, {share:.0%} of matches")
+
+    def write(self, json_path=None, prometheus_path=None):
+        """
+        Writes the JSON summary and/or the Prometheus text file. Each is written to a temporary file and renamed into place,
+            so a collector never reads half of one
+            """
+        for path, text in ((json_path, lambda: json.dumps(self.summary(), indent=2)), (prometheus_path, self.prometheus)):
+            if not path:
+                continue
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, "w") as f:
+                f.write(text())
+            os.replace(temp, path)
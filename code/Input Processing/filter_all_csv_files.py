@@ -1,9 +1,28 @@
 def filter_csv(enriched_file, output_file):
+    import os
     import pandas as pd
+    from collections import Counter
     from build_metadata import build_project_metadata_dict
-
-    # Load enriched file
-    enriched_df = pd.read_csv(enriched_file, converters={"Authors": eval})
+    from normalization import extract_keywords
+    from author_table import author_lists, author_table_path, read_author_table, write_author_table
+    from artifacts import FILTERED_OUTPUT_SCHEMA, read_table, write_table
+
+    # Load enriched file (CSV or Parquet) and its authors
+    enriched_df = read_table(enriched_file)
+    authors_file = author_table_path(enriched_file)
+    if "OutputID" in enriched_df.columns and os.path.exists(authors_file):
+        authors_by_id = author_lists(read_author_table(authors_file))
+    else:
+        # Enriched files written before the author table hold each author list as a literal in "Authors";
+        # one with OutputIDs whose author table is missing has no authors to match
+        import ast
+        if "OutputID" not in enriched_df.columns:
+            enriched_df.insert(0, "OutputID", range(len(enriched_df)))
+        if "Authors" in enriched_df.columns:
+            authors = enriched_df.pop("Authors").map(lambda value: ast.literal_eval(value) if isinstance(value, str) else [])
+        else:
+            authors = [[] for _ in range(len(enriched_df))]
+        authors_by_id = dict(zip(enriched_df["OutputID"], authors))
 
     # Load project metadata
     project_metadata_dict = build_project_metadata_dict("ProjectsAllMetadata.xlsx")
@@ -24,68 +43,80 @@ def filter_csv(enriched_file, output_file):
             return None, parts[0].lower()
         return parts[0][0].lower(), parts[-1].lower()
 
-    def extract_keywords(text):
+    def build_pi_index(project_metadata_dict):
         """
-        Extract keywords from a block of text (e.g., abstract or title)
+        Indexes the PIs once so each author is matched in O(1) instead of scanning every project.
+            Holds the first project position and PI name for each (last name, first initial) pair
+            (initial None when the PI has no first name) and for each last name,
+            plus every PI's projects keyed on the normalized PI name, along with an inverted index
+            from abstract keyword to the positions of that PI's projects using it
+            """
+        first_by_key, first_by_last, projects_by_pi = {}, {}, {}
+        for position, (projid, meta) in enumerate(project_metadata_dict.items()):
+            pi_name = meta.get("ProjectPI", "")
+            pi_init, pi_last = extract_initial_and_last(pi_name)
+            if pi_last is None:
+                continue
+            first_by_key.setdefault((pi_last, pi_init), (position, pi_name))
+            first_by_last.setdefault(pi_last, (position, pi_name))
+            candidates = projects_by_pi.setdefault(normalize_name(pi_name), {"projects": [], "postings": {}})
+            keywords = meta.get("AbstractKeywords")
+            if keywords is None:
+                keywords = extract_keywords(meta.get("Abstract", ""))
+            for keyword in keywords:
+                candidates["postings"].setdefault(keyword, []).append(len(candidates["projects"]))
+            candidates["projects"].append((projid, meta))
+        return first_by_key, first_by_last, projects_by_pi
+
+    def match_pi(author):
         """
-        if not isinstance(text, str):
-            return set()
-
-        common_words = {
-            "a", "an", "the", "and", "or", "in", "on", "of", "for", "with",
-            "to", "by", "their", "it", "its", "this", "that", "as", "from",
-            "is", "are", "was", "were", "be"
-        }
-
-        words = text.lower().split()
-        words = [word.strip(",!?():;.\"'") for word in words]
-        keywords = {word for word in words if word not in common_words and len(word) > 2}
-
-        return keywords
+        Returns the PI an author matches: same last name and same first initial, or a missing initial on either side.
+            When several PIs qualify, the one listed first in the metadata sheet wins
+            """
+        a_init, a_last = extract_initial_and_last(author)
+        if a_last is None:
+            return None
+        if a_init is None:
+            hit = first_by_last.get(a_last)
+        else:
+            hits = [h for h in (first_by_key.get((a_last, a_init)), first_by_key.get((a_last, None))) if h]
+            hit = min(hits) if hits else None
+        return hit[1] if hit else None
 
     def match_output_to_project(output_title, candidate_projects):
         """
-        Given an output title and a dict of candidate project metadata, return
+        Given an output title and a PI's indexed candidate projects, return
         the best-matching (projid, metadata) tuple based on keyword overlap.
+        Overlaps are counted through the keyword index, so only projects sharing a keyword are touched;
+        ties go to the project listed first, as does a title that shares no keywords at all.
         """
         title_keywords = extract_keywords(output_title)
+        projects, postings = candidate_projects["projects"], candidate_projects["postings"]
+        if not projects:
+            return None
 
-        best_match = None
-        max_overlap = -1
-
-        for projid, metadata in candidate_projects.items():
-            abstract = metadata.get("Abstract", "")
-            abstract_keywords = extract_keywords(abstract)
-            overlap = len(title_keywords & abstract_keywords)
-
-            if overlap > max_overlap:
-                best_match = (projid, metadata)
-                max_overlap = overlap
+        overlaps = Counter()
+        for keyword in title_keywords:
+            for position in postings.get(keyword, ()):
+                overlaps[position] += 1
 
-        return best_match
+        best = min(overlaps, key=lambda position: (-overlaps[position], position)) if overlaps else 0
+        return projects[best]
 
     # Match authors to PIs and merge info
+    first_by_key, first_by_last, projects_by_pi = build_pi_index(project_metadata_dict)
     filtered_rows = []
     for _, row in enriched_df.iterrows():
-        authors = row.get("Authors", [])
+        authors = authors_by_id.get(row["OutputID"], [])
         matched_pi_name = None
         matched_projects = {}
 
         # Step 1: Match an author to a PI
         for author in authors:
-            a_init, a_last = extract_initial_and_last(author)
-            for pi_norm, meta in project_metadata_dict.items():
-                pi_name = meta.get("ProjectPI", "")
-                pi_init, pi_last = extract_initial_and_last(pi_name)
-                if a_last == pi_last and (a_init == pi_init or not a_init or not pi_init):
-                    matched_pi_name = pi_name
-                    # Collect all projects by this PI
-                    matched_projects = {
-                        projid: m for projid, m in project_metadata_dict.items()
-                        if normalize_name(m.get("ProjectPI", "")) == normalize_name(pi_name)
-                    }
-                    break
+            matched_pi_name = match_pi(author)
             if matched_pi_name:
+                # Collect all projects by this PI
+                matched_projects = projects_by_pi[normalize_name(matched_pi_name)]
                 break
 
         # Step 2: If a PI is matched, now choose the best matching project
@@ -102,11 +133,15 @@ def filter_csv(enriched_file, output_file):
                     "ProjectYearEnded": int(meta["ProjectYearEnded"]) if pd.notna(meta.get("ProjectYearEnded")) else pd.NA,
                     "ProjectPI": meta.get("ProjectPI", "")
                 }
-                # Combine with row (excluding Authors)
-                enriched_row.update(row.drop(labels=["Authors"]).to_dict())
+                # Combine with row
+                enriched_row.update(row.to_dict())
                 filtered_rows.append(enriched_row)
 
+    # Named columns, so an input with no matches still gives an (empty) table
+    project_columns = ["ProjID", "ProjectStatus", "ProjectTitle", "ProjectRDC", "ProjectYearStarted", "ProjectYearEnded", "ProjectPI"]
+    final_df = pd.DataFrame(filtered_rows, columns=project_columns + list(enriched_df.columns))
     # Sort by ProjID and write to CSV
-    final_df = pd.DataFrame(filtered_rows)
     final_df = final_df.sort_values(by="ProjID", key=lambda col: pd.to_numeric(col, errors='coerce'))
-    final_df.to_csv(output_file, index=False)
\ No newline at end of file
+    write_table(final_df, output_file, FILTERED_OUTPUT_SCHEMA)
+    write_author_table(author_table_path(output_file), final_df["OutputID"],
+                       [authors_by_id.get(output_id, []) for output_id in final_df["OutputID"]])
\ No newline at end of file
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised instead of sending a request to a host whose circuit breaker is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker: after `threshold` failed requests in a row the host is skipped
+        for `cooldown` seconds, then a single trial request decides whether it is closed again
+        """
+
+    def __init__(self, threshold=5, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.opened_at = {}
+        self.lock = threading.Lock()
+
+    def allow(self, host):
+        with self.lock:
+            opened = self.opened_at.get(host)
+            if opened is None:
+                return True
+            if time.monotonic() - opened >= self.cooldown:
+                # Half-open: let one request through and re-open straight away if it fails
+                self.opened_at[host] = time.monotonic()
+                self.failures[host] = self.threshold - 1
+                return True
+            return False
+
+    def record_success(self, host):
+        with self.lock:
+            self.failures.pop(host, None)
+            self.opened_at.pop(host, None)
+
+    def record_failure(self, host):
+        with self.lock:
+            self.failures[host] = self.failures.get(host, 0) + 1
+            if self.failures[host] >= self.threshold:
+                self.opened_at[host] = time.monotonic()
+
+
+class SessionPool:
+    """
+    Shared requests.Session with keep-alive connection pools, retries with exponential backoff
+        and full jitter, Retry-After support, and a per-host circuit breaker
+        """
+
+    def __init__(self, pool_size=10, retries=4, backoff=0.5, max_backoff=30, timeout=30, breaker=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def retry_delay(self, attempt, response):
+        """
+        Seconds to wait before the next attempt: the server's Retry-After if it sent one,
+            otherwise a random delay up to backoff * 2**attempt
+            """
+        header = response.headers.get("Retry-After") if response is not None else None
+        if header:
+            try:
+                return min(float(header), self.max_backoff)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(header).timestamp() - time.time()
+                    return min(max(wait, 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        """
+        GETs url, retrying rate-limited, failed, and timed-out requests.
+            Returns the last response once retries run out; raises if the host never answered
+            """
+        host = urlparse(url).netloc
+        if not self.breaker.allow(host):
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request")
+
+        kwargs.setdefault("timeout", self.timeout)
+        response, error = None, None
+        for attempt in range(self.retries + 1):
+            try:
+                response, error = self.session.get(url, **kwargs), None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success(host)
+                return response
+            if attempt < self.retries:
+                time.sleep(self.retry_delay(attempt, response))
+
+        self.breaker.record_failure(host)
+        if response is not None:
+            return response
+        raise error
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,92 @@
+import re
+from functools import lru_cache
+
+# Patterns compiled once and shared by every stage, so a title gets the same key wherever it is normalized
+QUOTES = re.compile(r"[’‘“”]")
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+# Numbers in a normalized title: digits, and Roman numerals up to XXXIX ("part ii"), which mark distinct outputs
+NUMBER_TOKENS = re.compile(r"\d+|\b(?=[ivx]+\b)x{0,3}(?:ix|iv|v?i{0,3})\b")
+
+# Distinct titles remembered by the scalar functions; each is normalized once per run however often it is looked up
+NORMALIZE_CACHE_SIZE = 1 << 16
+
+DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:")
+
+# Words too common to say anything about which project an output belongs to
+COMMON_WORDS = {
+    "a", "an", "the", "and", "or", "in", "on", "of", "for", "with",
+    "to", "by", "their", "it", "its", "this", "that", "as", "from",
+    "is", "are", "was", "were", "be"
+}
+KEYWORD_PUNCTUATION = ",!?():;.\"'"
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)
+def normalize_title(title):
+    """
+    Lowercases the title, unifies quotes, and drops punctuation and extra whitespace
+    """
+    title = str(title).lower()
+    title = QUOTES.sub("'", title)
+    title = PUNCTUATION.sub("", title)
+    title = WHITESPACE.sub(" ", title)
+    return title.strip()
+
+
+def normalize_titles(titles):
+    """
+    normalize_title for a whole Series; each distinct title is normalized once, by the same compiled patterns
+    """
+    import pandas as pd
+
+    titles = pd.Series(titles)
+    codes, distinct = pd.factorize(titles.astype(object).map(str))
+    # Python str methods, not Arrow's, so the keys match the scalar path exactly
+    keys = (pd.Index(distinct, dtype=object).str.lower()
+              .str.replace(QUOTES, "'", regex=True)
+              .str.replace(PUNCTUATION, "", regex=True)
+              .str.replace(WHITESPACE, " ", regex=True)
+              .str.strip())
+    return pd.Series(keys.to_numpy(dtype=object)[codes], index=titles.index, dtype=object)
+
+
+def number_tokens(key):
+    """
+    The numbers in a normalized title, in order. Titles that are otherwise near-identical but differ in these
+        ("2010 census" and "2020 census", "part i" and "part ii") are different outputs
+        """
+    return tuple(token for token in NUMBER_TOKENS.findall(key) if token)
+
+
+def clean_titles(titles):
+    """
+    Fixes the spacing of a Series of titles, keeping their case and punctuation
+    """
+    return titles.astype(str).str.replace(WHITESPACE, " ", regex=True).str.strip()
+
+
+def doi_key(doi):
+    """
+    Lowercases a DOI and strips its URL prefix so DOIs from different sources can be matched
+    """
+    if not isinstance(doi, str) or not doi.strip():
+        return None
+    doi = doi.strip().lower()
+    for prefix in DOI_PREFIXES:
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.strip() or None
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def extract_keywords(text):
+    """
+    Extract keywords from a block of text (e.g., abstract or title)
+    """
+    if not isinstance(text, str):
+        return frozenset()
+
+    words = text.lower().split()
+    words = [word.strip(KEYWORD_PUNCTUATION) for word in words]
+    return frozenset(word for word in words if word not in COMMON_WORDS and len(word) > 2)
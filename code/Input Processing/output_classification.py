@@ -0,0 +1,184 @@
+import re
+
+# Keywords that mark each OutputType, checked in this order against the citation and venue
+TYPE_KEYWORDS = {
+    "WP": ["arxiv", "ssrn", "nber", "mimeo", "working paper", "white paper", "technical report", "preprint", "discussion paper"],
+    "JA": ["journal", "review", "letters", "transactions", "proceedings", "bulletin", "chaos", "fractals", "economic", "science", "statistics"],
+    "MI": ["media", "interview", "press release", "news"],
+    "BC": ["book chapter", "in ", "edited volume"],
+    "BK": ["book", "monograph"],
+    "RE": ["report", "census report", "annual report"],
+    "TN": ["technical note"],
+    "DI": ["dissertation", "thesis"],
+    "SW": ["software", "codebase", "repository", "github"],
+    "MT": ["multimedia", "video", "podcast"],
+    "DS": ["dataset", "data release"],
+    "BG": ["blog", "opinion", "column", "newsletter"]
+}
+
+# Citations of the form 'Authors (2020). "Title". *Journal*' are journal articles
+JOURNAL_CITATION_PATTERN = r"\d{4}\)\. \"(?:.*?)\"\.* \*.*?\*"
+
+# Citation words that mark an output as unpublished, and venue words that mark a journal as published
+WP_STATUS_KEYWORDS = ["working paper", "white paper", "technical report", "arxiv", "ssrn", "nber", "mimeo", "preprint", "discussion paper", "conference"]
+JOURNAL_STATUS_KEYWORDS = ["journal", "review", "letters", "transactions", "proceedings", "bulletin", "matematika", "economic", "statistics"]
+
+
+def keyword_pattern(keywords):
+    """
+    Compiles a keyword list into one alternation regex matching any of them as a substring
+    """
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+TYPE_PATTERNS = {type_code: keyword_pattern(keywords) for type_code, keywords in TYPE_KEYWORDS.items()}
+WP_STATUS_PATTERN = keyword_pattern(WP_STATUS_KEYWORDS)
+JOURNAL_STATUS_PATTERN = keyword_pattern(JOURNAL_STATUS_KEYWORDS)
+
+
+def infer_output_type(row):
+    """
+    Uses OutputBiblio and OutputVenue to determine the OutputType
+    """
+    citation = str(row.get("OutputBiblio", "")).lower()
+    venue = str(row.get("OutputVenue", "")).lower()
+
+    if "*" in citation and re.search(JOURNAL_CITATION_PATTERN, citation):
+        return "JA"
+
+    for type_code, keywords in TYPE_KEYWORDS.items():
+        if any(keyword in citation or keyword in venue for keyword in keywords):
+            return type_code
+
+    return "WP"  # assume WP if uncertain
+
+
+def infer_output_status(row):
+    """
+    Uses OutputVenue, OutputType, and OutputBiblio to determine OutputStatus
+    """
+    output_type = row.get("OutputType", "")
+    venue = str(row.get("OutputVenue", "")).lower()
+    citation = str(row.get("OutputBiblio", "")).lower()
+
+    if venue.strip() == "":
+        return "UP"
+
+    if any(word in citation for word in WP_STATUS_KEYWORDS):
+        return "UP"
+
+    if output_type == "JA" and any(j in venue for j in JOURNAL_STATUS_KEYWORDS):
+        return "PB"
+
+    if output_type == "WP":
+        return "UP"
+
+    return "PB"
+
+
+def lowered_text(values):
+    """
+    Dictionary-encodes str() of each value: returns (codes, distinct values lowercased). str() and Python's str.lower
+        are used so missing values become "nan"/"<na>"/"none" and case folds exactly as in the row-wise functions.
+        The distinct values are held as an Arrow string column when pyarrow is installed, so the keyword regexes
+        below run in Arrow's C++ regex kernel, once per distinct value, instead of once per row in Python
+        """
+    import pandas as pd
+
+    values = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=False) != "string":
+        values = values.map(str).astype(object)
+    codes, distinct = pd.factorize(values)
+    # The object Index keeps .str usable when there are no values at all
+    text = pd.Series(pd.Index(distinct, dtype=object).str.lower(), dtype=object)
+    try:
+        return codes, text.astype("string[pyarrow]")
+    except ImportError:
+        return codes, text
+
+
+def contains(encoded, pattern, rows=None):
+    """
+    Boolean array: which values of a lowered_text column (only those at positions rows, if given)
+        the regex pattern (str or compiled) matches. Each distinct value is matched once
+        """
+    import numpy as np
+
+    codes, text = encoded
+    codes = codes if rows is None else codes[rows]
+    needed = np.zeros(len(text), dtype=bool)
+    needed[codes] = True
+    needed = np.flatnonzero(needed)
+    hits = np.zeros(len(text), dtype=bool)
+    if len(needed) == len(text):
+        hits = text.str.contains(getattr(pattern, "pattern", pattern), regex=True).to_numpy(dtype=bool)
+    elif len(needed):
+        hits[needed] = text.iloc[needed].str.contains(getattr(pattern, "pattern", pattern), regex=True).to_numpy(dtype=bool)
+    return hits[codes]
+
+
+def type_labels(citation, venue, count):
+    """
+    Column-wise infer_output_type over lowered_text columns: each keyword family is one regex pass over the rows
+        still unlabelled, and the first family that matches a row labels it
+        """
+    import numpy as np
+
+    labels = np.full(count, "WP", dtype=object)
+    journal_citation = contains(citation, r"\*") & contains(citation, JOURNAL_CITATION_PATTERN)
+    labels[journal_citation] = "JA"
+    pending = np.flatnonzero(~journal_citation)
+    for type_code, pattern in TYPE_PATTERNS.items():
+        if not len(pending):
+            break
+        matched = contains(citation, pattern, pending) | contains(venue, pattern, pending)
+        labels[pending[matched]] = type_code
+        pending = pending[~matched]
+    return labels
+
+
+def status_labels(types, citation, venue):
+    """
+    Column-wise infer_output_status over lowered_text columns
+    """
+    import numpy as np
+
+    conditions = [
+        contains(venue, r"^\s*$"),
+        contains(citation, WP_STATUS_PATTERN),
+        (types == "JA") & contains(venue, JOURNAL_STATUS_PATTERN),
+        types == "WP",
+    ]
+    return np.select(conditions, ["UP", "UP", "PB", "UP"], default="PB").astype(object)
+
+
+def classify_output_types(biblios, venues):
+    """
+    Same result as applying infer_output_type to every row, computed a column at a time
+    """
+    import pandas as pd
+
+    labels = type_labels(lowered_text(biblios), lowered_text(venues), len(biblios))
+    return pd.Series(labels, index=biblios.index, dtype=object)
+
+
+def classify_output_statuses(types, biblios, venues):
+    """
+    Same result as applying infer_output_status to every row, computed a column at a time
+    """
+    import pandas as pd
+
+    labels = status_labels(types.to_numpy(), lowered_text(biblios), lowered_text(venues))
+    return pd.Series(labels, index=biblios.index, dtype=object)
+
+
+def classify_outputs(biblios, venues):
+    """
+    (OutputType, OutputStatus) for every row, lowering and encoding each column only once for both
+    """
+    import pandas as pd
+
+    citation, venue = lowered_text(biblios), lowered_text(venues)
+    types = type_labels(citation, venue, len(biblios))
+    statuses = status_labels(types, citation, venue)
+    return pd.Series(types, index=biblios.index, dtype=object), pd.Series(statuses, index=biblios.index, dtype=object)
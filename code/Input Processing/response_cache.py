@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response built from a cache entry
+    """
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """
+    On-disk SQLite cache of API responses, keyed on a hash of the endpoint and the normalized query.
+        Hits (found records) live for `ttl` seconds and misses for `negative_ttl` seconds.
+        Once the stored bodies pass `max_bytes`, the least recently used entries are evicted.
+        """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, negative_ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, status INTEGER, body TEXT, size INTEGER, "
+            "negative INTEGER, expires REAL, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint, query):
+        """
+        Content-addressed key for an (endpoint, normalized query) pair
+        """
+        query = " ".join(str(query).lower().split())
+        return hashlib.sha256(f"{endpoint}\n{query}".encode("utf-8")).hexdigest()
+
+    def get(self, endpoint, query):
+        """
+        Returns the cached response, or None if it is missing or expired
+        """
+        key = self.make_key(endpoint, query)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT status, body, size, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[3] < now:
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.total_bytes -= row[2]
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return CachedResponse(row[0], row[1])
+
+    def put(self, endpoint, query, status_code, text, negative=False):
+        """
+        Stores a response; negative entries (lookups that found nothing) get the shorter TTL
+        """
+        key = self.make_key(endpoint, query)
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        expires = now + (self.negative_ttl if negative else self.ttl)
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, status_code, text, size, int(negative), expires, now),
+            )
+            self.total_bytes += size
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """
+        Deletes least recently used entries until the cache fits in max_bytes (lock must be held)
+        """
+        while self.total_bytes > self.max_bytes:
+            oldest = self.conn.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 100").fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,218 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from normalization import doi_key, normalize_title, number_tokens
+
+# Share of trigrams a fuzzy match must have in common with the searched title (Jaccard similarity)
+TITLE_MATCH_THRESHOLD = 0.9
+# How many full-text candidates are scored for a title that has no exact match
+FUZZY_CANDIDATES = 20
+# Shorter titles are only matched exactly: a single changed character moves them too far
+FUZZY_MIN_LENGTH = 20
+
+# Metadata tuples are stored in this order, the same order the API searches return them in
+RECORD_FIELDS = ["title", "authors", "year", "month", "journal", "volume", "issue", "pages", "doi", "source"]
+
+# Columns of a research output table (e.g. 2024 ResearchOutput.xlsx) that fill each metadata field
+OUTPUT_TABLE_FIELDS = {
+    "title": "OutputTitle",
+    "journal": "OutputVenue",
+    "year": "OutputYear",
+    "month": "OutputMonth",
+    "volume": "OutputVolume",
+    "issue": "OutputNumber",
+    "pages": "OutputPages",
+}
+# A DOI at the end of an APA citation, as make_apa_citation writes it
+CITATION_DOI_PATTERN = r"(10\.\d{4,9}/\S+)$"
+# The author list of an APA citation, before "(YYYY)" or "(n.d.)", and the pieces it splits into
+CITATION_AUTHORS = re.compile(r"^(.*?)\s+\((?:\d{4}|n\.d\.)\)")
+AUTHOR_SEPARATOR = re.compile(r",?\s+&\s+|,\s+")
+INITIALS = re.compile(r"^(?:\w\.[\s-]*)+$")
+
+
+def trigrams(key):
+    return {key[i:i + 3] for i in range(max(len(key) - 2, 1))}
+
+
+def citation_author_list(biblio):
+    """
+    The authors of an APA citation as "F. M. Last" names: "Last, F. M., Other, A., & Third, B. (2004)..."
+    """
+    match = CITATION_AUTHORS.match(biblio) if isinstance(biblio, str) else None
+    if not match:
+        return []
+    parts = [part.strip() for part in AUTHOR_SEPARATOR.split(match.group(1)) if part.strip()]
+    authors = []
+    while parts:
+        last = parts.pop(0)
+        if parts and INITIALS.match(parts[0]):
+            authors.append(f"{parts.pop(0)} {last}")
+        else:
+            authors.append(last)
+    return authors
+
+
+class TitleIndex:
+    """
+    On-disk index of titles that are already resolved, checked before any API is searched.
+        Records are stored under their normalized title; a title with no exact match is looked up through an
+        FTS5 trigram index and accepted if its trigram similarity reaches `threshold`, unless the two DOIs
+        or the numbers in the two titles disagree.
+        Without the FTS5 trigram tokenizer (SQLite older than 3.34) only exact matches are found
+        """
+
+    def __init__(self, path, threshold=TITLE_MATCH_THRESHOLD):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.threshold = threshold
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS titles (id INTEGER PRIMARY KEY, key TEXT UNIQUE, doi TEXT, record TEXT)")
+        # Local files already indexed, with the modification time and size they had
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime REAL, size INTEGER)")
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS title_trigrams USING fts5(key, tokenize='trigram', content='')")
+            self.fuzzy = True
+        except sqlite3.OperationalError:
+            self.fuzzy = False
+        self.conn.commit()
+
+    @staticmethod
+    def encode(record):
+        import pandas as pd
+
+        # NumPy numbers (from typed tables) are stored as plain JSON numbers
+        return json.dumps([None if not isinstance(value, list) and pd.isna(value) else value for value in record],
+                          default=lambda value: value.item())
+
+    @staticmethod
+    def decode(text):
+        """
+        The stored metadata tuple, with missing values as pd.NA like the API searches give them
+        """
+        import pandas as pd
+
+        record = json.loads(text)
+        return tuple(pd.NA if value is None else value for value in record)
+
+    def lookup(self, key, doi=None):
+        """
+        Returns the metadata tuple indexed under the normalized title key, or under a title similar enough to it,
+            or None
+            """
+        doi = doi_key(doi)
+        with self.lock:
+            row = self.conn.execute("SELECT doi, record FROM titles WHERE key = ?", (key,)).fetchone()
+            if row and (doi is None or row[0] is None or row[0] == doi):
+                self.exact_hits += 1
+                return self.decode(row[1])
+
+            match = self.fuzzy_match(key, doi) if self.fuzzy and len(key) >= FUZZY_MIN_LENGTH else None
+            if match is None:
+                self.misses += 1
+                return None
+            self.fuzzy_hits += 1
+            return self.decode(match)
+
+    def fuzzy_match(self, key, doi):
+        """
+        Scores the full-text candidates for key by trigram similarity and returns the best record over the threshold
+            (lock must be held)
+            """
+        # Numbers in the title ("Part 2", "Part II", a year) must be the same for a fuzzy match
+        wanted, numbers = trigrams(key), number_tokens(key)
+        query = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in wanted)
+        candidates = self.conn.execute(
+            "SELECT titles.key, titles.doi, titles.record FROM title_trigrams JOIN titles ON titles.id = title_trigrams.rowid "
+            "WHERE title_trigrams MATCH ? ORDER BY rank LIMIT ?", (query, FUZZY_CANDIDATES)
+        ).fetchall()
+
+        best, best_score = None, self.threshold
+        for candidate_key, candidate_doi, record in candidates:
+            if doi is not None and candidate_doi is not None and candidate_doi != doi:
+                continue
+            if number_tokens(candidate_key) != numbers:
+                continue
+            found = trigrams(candidate_key)
+            score = len(wanted & found) / len(wanted | found)
+            if score >= best_score:
+                best, best_score = record, score
+        return best
+
+    def add(self, key, record, commit=True):
+        """
+        Indexes a metadata tuple under a normalized title key, and under the normalized form of its own title;
+            a key that is already indexed keeps its record
+            """
+        keys = {key, normalize_title(record[0])} if record[0] else {key}
+        doi, text = doi_key(record[8]), self.encode(record)
+        with self.lock:
+            for title_key in keys:
+                if not title_key:
+                    continue
+                cursor = self.conn.execute("INSERT OR IGNORE INTO titles (key, doi, record) VALUES (?, ?, ?)", (title_key, doi, text))
+                if cursor.rowcount and self.fuzzy:
+                    self.conn.execute("INSERT INTO title_trigrams (rowid, key) VALUES (?, ?)", (cursor.lastrowid, title_key))
+            if commit:
+                self.conn.commit()
+
+    def add_output_table(self, file, source="Local"):
+        """
+        Indexes every output in a research output table (.xlsx, .csv, or .parquet) unless the file is unchanged since
+            it was last indexed. Authors come from the table's author table if it has one (see author_table.py),
+            else from the APA citations in OutputBiblio; DOIs from a DOI column or the end of the citation
+            """
+        import pandas as pd
+        from artifacts import read_table
+        from author_table import author_lists, author_table_path, read_author_table
+        from citations import MONTH_LOOKUP
+
+        stat = os.stat(file)
+        with self.lock:
+            seen = self.conn.execute("SELECT mtime, size FROM sources WHERE path = ?", (os.path.abspath(file),)).fetchone()
+        if seen == (stat.st_mtime, stat.st_size):
+            return 0
+
+        # Read as text, so a volume or year is stored as "12", not 12.0
+        table = pd.read_excel(file, dtype=str) if file.endswith(".xlsx") else read_table(file, dtype=str)
+        table = table[table["OutputTitle"].notna()].reset_index(drop=True)
+        fields = pd.DataFrame({field: table[column] if column in table.columns else pd.NA
+                               for field, column in OUTPUT_TABLE_FIELDS.items()})
+
+        # Month names ("May") are stored as numbers, as the APIs give them
+        month_numbers = {name.lower(): number for number, name in MONTH_LOOKUP.items()}
+        months = fields["month"].map(lambda month: month_numbers.get(month.strip().lower(), month) if isinstance(month, str) else month)
+        fields["month"] = months.astype(object)
+
+        biblios = table["OutputBiblio"].astype(object) if "OutputBiblio" in table.columns else pd.Series(pd.NA, index=table.index, dtype=object)
+        doi_column = next((column for column in ("DOI", "doi", "OutputDOI") if column in table.columns), None)
+        fields["doi"] = (table[doi_column] if doi_column
+                         else biblios.where(biblios.map(type) == str).str.extract(CITATION_DOI_PATTERN, expand=False))
+        by_id = {}
+        if "OutputID" in table.columns and os.path.exists(author_table_path(file)):
+            by_id = author_lists(read_author_table(author_table_path(file)))
+        # The table was read as text but the author table's ids are integers; outputs it lacks fall back on the citation
+        output_ids = pd.to_numeric(table["OutputID"], errors="coerce") if by_id else pd.Series(pd.NA, index=table.index)
+        fields["authors"] = [by_id[output_id] if output_id in by_id else citation_author_list(biblio)
+                             for output_id, biblio in zip(output_ids, biblios)]
+        fields["source"] = source
+
+        for record in fields[RECORD_FIELDS].itertuples(index=False, name=None):
+            self.add(normalize_title(record[0]), record, commit=False)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (os.path.abspath(file), stat.st_mtime, stat.st_size))
+            self.conn.commit()
+        return len(fields)
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -1,161 +1,157 @@
-
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
+import hashlib
+import json
+import os
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboard_summary import DashboardSummary
 
 sns.set_style("whitegrid")
 
+GRAPHS_DIR = "Graphs"
+# Hash of the data each graph was last rendered from, so unchanged graphs are not redrawn
+RENDER_STATE_FILE = ".cache/graphs_state.json"
+# Dashboard statistics read by index.html
+SUMMARY_FILE = "dashboard_summary.json"
+
 
 def visualize_csv(file_path):
     """
-    Load a CSV of research outputs and produce in order:
+    Summarize a research outputs table (CSV or Parquet, read in chunks by DashboardSummary) and show in order:
       1. Top 10 RDCs by number of research outputs
       2. Publications per year (Year vs. count)
       3. Top 10 most prolific authors
       4. Distribution of Output Types
-      5. Cleaned boxplot of Output Pages by Output Type
-      6. Top projects by number of publications
+      5. Top projects by number of publications
     """
-    df = pd.read_csv(file_path)
-
-    top_10_rdcs(df)
-    publications_per_year(df)
-    top_10_authors(df)
-    distribution_of_output_types(df)
-    top_projects_by_publications(df)
+    summary = DashboardSummary.from_table(file_path)
+    for aggregate, plot in GRAPHS.values():
+        plot(aggregate(summary))
+        plt.show()
 
 
 def top_10_rdcs(df):
     """
     1. Top 10 RDCs by number of research outputs.
     """
-    rdc_counts = (
-        df.groupby("ProjectRDC")
-          .size()
-          .sort_values(ascending=False)
-          .head(10)
-          .sort_values()
-    )
-    plt.figure(figsize=(10, 6))
+    plot_top_10_rdcs(DashboardSummary.from_frame(df).rdc_counts())
+    plt.show()
+
+
+def plot_top_10_rdcs(rdc_counts):
+    fig, ax = plt.subplots(figsize=(10, 6))
     sns.barplot(
         x=rdc_counts.values,
         y=rdc_counts.index,
         palette="Blues_d",
-        edgecolor=".3"
+        edgecolor=".3",
+        ax=ax
     )
-    plt.title("Top 10 RDCs by Number of Research Outputs", fontsize=16)
-    plt.xlabel("Number of Outputs", fontsize=12)
-    plt.ylabel("RDC", fontsize=12)
-    plt.tight_layout()
-    plt.show()
+    ax.set_title("Top 10 RDCs by Number of Research Outputs", fontsize=16)
+    ax.set_xlabel("Number of Outputs", fontsize=12)
+    ax.set_ylabel("RDC", fontsize=12)
+    fig.tight_layout()
+    return fig
 
 
 def publications_per_year(df):
     """
     2. Publications per year (line chart).
     """
-    df_year = df.copy()
-    df_year["OutputYear"] = pd.to_numeric(df_year["OutputYear"], errors="coerce")
-    df_year = df_year.dropna(subset=["OutputYear"])
-    df_year["OutputYear"] = df_year["OutputYear"].astype(int)
-    counts = df_year.groupby("OutputYear").size()
+    plot_publications_per_year(DashboardSummary.from_frame(df).year_counts())
+    plt.show()
+
 
-    plt.figure(figsize=(10, 6))
+def plot_publications_per_year(counts):
+    fig, ax = plt.subplots(figsize=(10, 6))
     sns.lineplot(
         x=counts.index,
         y=counts.values,
         marker="o",
         color="tab:green",
-        linewidth=2
+        linewidth=2,
+        ax=ax
     )
-    plt.title("Publications per Year", fontsize=16)
-    plt.xlabel("Year", fontsize=12)
-    plt.ylabel("Number of Publications", fontsize=12)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    ax.set_title("Publications per Year", fontsize=16)
+    ax.set_xlabel("Year", fontsize=12)
+    ax.set_ylabel("Number of Publications", fontsize=12)
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
 
 
 def top_10_authors(df):
     """
     3. Top 10 most prolific authors.
     """
-    def extract_authors(cit):
-        if not isinstance(cit, str):
-            return []
-        m = re.match(r'^(.*?)\s+\(\d{4}|n\.d\.\)', cit)
-        if not m:
-            return []
-        return [a.strip() for a in m.group(1).split(" & ") if a.strip()]
-
-    def flip_name(name):
-        parts = name.split(", ")
-        return f"{parts[1]} {parts[0]}" if len(parts) == 2 else name
+    plot_top_10_authors(DashboardSummary.from_frame(df).author_counts())
+    plt.show()
 
-    df2 = df.copy()
-    df2["Authors"] = df2["OutputBiblio"].apply(extract_authors)
-    authors = df2["Authors"].explode().dropna().map(flip_name)
-    ac = authors.value_counts().head(10).sort_values()
 
-    plt.figure(figsize=(10, 6))
+def plot_top_10_authors(ac):
+    fig, ax = plt.subplots(figsize=(10, 6))
     sns.barplot(
         x=ac.values,
         y=ac.index,
         palette="magma",
-        edgecolor=".3"
+        edgecolor=".3",
+        ax=ax
     )
-    plt.title("Top 10 Most Prolific Authors", fontsize=16)
-    plt.xlabel("Number of Publications", fontsize=12)
-    plt.ylabel("")
-    plt.tight_layout()
-    plt.show()
+    ax.set_title("Top 10 Most Prolific Authors", fontsize=16)
+    ax.set_xlabel("Number of Publications", fontsize=12)
+    ax.set_ylabel("")
+    fig.tight_layout()
+    return fig
 
 
 def distribution_of_output_types(df):
     """
     4. Distribution of Output Types (bar chart).
     """
-    counts = df["OutputType"].value_counts()
-    plt.figure(figsize=(8, 5))
+    plot_distribution_of_output_types(DashboardSummary.from_frame(df).output_type_counts())
+    plt.show()
+
+
+def plot_distribution_of_output_types(counts):
+    fig, ax = plt.subplots(figsize=(8, 5))
     sns.barplot(
         x=counts.index,
         y=counts.values,
         palette="pastel",
-        edgecolor=".3"
+        edgecolor=".3",
+        ax=ax
     )
-    plt.title("Distribution of Output Types", fontsize=16)
-    plt.xlabel("Output Type", fontsize=12)
-    plt.ylabel("Count", fontsize=12)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    ax.set_title("Distribution of Output Types", fontsize=16)
+    ax.set_xlabel("Output Type", fontsize=12)
+    ax.set_ylabel("Count", fontsize=12)
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
 
 
 def top_projects_by_publications(df, top_n=10, min_pubs=1, wrap_width=40, annotate=True):
     """
-    6. Top projects by publication count.
+    5. Top projects by publication count.
     """
-    pc = (
-        df.groupby("ProjectTitle")
-          .size()
-          .rename("PublicationCount")
-          .reset_index()
-    )
-    filt = pc[pc["PublicationCount"] >= min_pubs]
-    tp = filt.sort_values("PublicationCount", ascending=False).head(top_n).copy()
-    tp["WrappedTitle"] = tp["ProjectTitle"].apply(
+    plot_top_projects_by_publications(DashboardSummary.from_frame(df).project_counts(top_n, min_pubs), wrap_width, annotate)
+    plt.show()
+
+
+def plot_top_projects_by_publications(tp, wrap_width=40, annotate=True):
+    tp = tp.assign(WrappedTitle=tp["ProjectTitle"].apply(
         lambda t: "\n".join(textwrap.wrap(t, wrap_width))
-    )
+    ))
 
-    plt.figure(figsize=(10, 6))
-    ax = sns.barplot(
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(
         data=tp,
         y="WrappedTitle",
         x="PublicationCount",
         palette="rocket",
-        edgecolor=".3"
+        edgecolor=".3",
+        ax=ax
     )
 
     if annotate:
@@ -172,8 +168,91 @@ def top_projects_by_publications(df, top_n=10, min_pubs=1, wrap_width=40, annota
     ax.set_title(f"Top {len(tp)} Projects by Publications", fontsize=16)
     ax.set_xlabel("Number of Publications", fontsize=12)
     ax.set_ylabel("")
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return fig
+
+
+# Graph file name (without extension) -> (DashboardSummary aggregation, plot)
+GRAPHS = {
+    "Top10_RDCS": (DashboardSummary.rdc_counts, plot_top_10_rdcs),
+    "PublicationsPerYear": (DashboardSummary.year_counts, plot_publications_per_year),
+    "Top10_Prolific_Authors": (DashboardSummary.author_counts, plot_top_10_authors),
+    "Distribution_of_Output_Types": (DashboardSummary.output_type_counts, plot_distribution_of_output_types),
+    "Top10_Projects_by_Publications": (DashboardSummary.project_counts, plot_top_projects_by_publications),
+}
+
+
+def graph_paths(name, out_dir=GRAPHS_DIR, formats=("png",)):
+    return [os.path.join(out_dir, f"{name}.{fmt}") for fmt in formats]
+
+
+def init_render_worker():
+    """
+    Render workers draw off-screen
+    """
+    plt.switch_backend("Agg")
+
+
+def render_graph(name, data, out_dir, formats):
+    """
+    Draws one graph from its aggregated data and saves it in each format, closing the figure afterwards
+    """
+    fig = GRAPHS[name][1](data)
+    try:
+        for path in graph_paths(name, out_dir, formats):
+            fig.savefig(path, dpi=150)
+    finally:
+        plt.close(fig)
+    return name
+
+
+def render_graphs(file_path, out_dir=GRAPHS_DIR, formats=("png",), max_workers=None, state_file=RENDER_STATE_FILE, force=False):
+    """
+    Headless version of visualize_csv: saves every graph to out_dir (as PNG and/or SVG) instead of showing it.
+        All counts come from one chunked pass over the CSV, which is also written to out_dir as SUMMARY_FILE
+        for index.html. The drawing is spread over worker processes.
+        A graph is only redrawn when its aggregated data, this file, or the requested formats changed, or a file is missing;
+        force=True redraws every graph regardless. Returns the names of the graphs that were redrawn
+        """
+    summary = DashboardSummary.from_table(file_path)
+    os.makedirs(out_dir, exist_ok=True)
+    summary.write_json(os.path.join(out_dir, SUMMARY_FILE))
+
+    with open(__file__, "rb") as f:
+        code_digest = hashlib.sha256(f.read()).hexdigest()
+
+    state = {}
+    if os.path.exists(state_file):
+        with open(state_file, encoding="utf-8") as f:
+            state = json.load(f)
+
+    pending = {}
+    for name, (aggregate, _) in GRAPHS.items():
+        data = aggregate(summary)
+        digest = hashlib.sha256(f"{code_digest}\0{out_dir}\0{formats}\0{data.to_csv()}".encode("utf-8")).hexdigest()
+        paths = graph_paths(name, out_dir, formats)
+        if not force and state.get(name) == digest and all(os.path.exists(path) for path in paths):
+            print(f"{name}: unchanged, skipping")
+            continue
+        pending[name] = (data, digest)
+
+    if not pending:
+        return []
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or len(pending), initializer=init_render_worker) as executor:
+            futures = [executor.submit(render_graph, name, data, out_dir, formats) for name, (data, _) in pending.items()]
+            for future in futures:
+                name = future.result()
+                state[name] = pending[name][1]
+                print(f"{name}: saved to {', '.join(graph_paths(name, out_dir, formats))}")
+    finally:
+        # Record the graphs that did render even if another one failed
+        if os.path.dirname(state_file):
+            os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+    return list(pending)
 
 
 if __name__ == "__main__":
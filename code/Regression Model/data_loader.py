@@ -0,0 +1,134 @@
+import hashlib
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Artifact reading and writing is shared with the input processing stages
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Input Processing"))
+import artifacts
+from artifacts import artifact_path, read_table
+
+# Section 1 outputs plus the 2024 research output sheet, merged into one frame for every analysis.
+# The Section 1 files take the extension of the configured artifact format (see artifacts.py)
+INPUT_FILES = ["ResearchOutputs_Group4.csv", "Group4_Enriched.csv", "2024 ResearchOutput.xlsx"]
+FEATURE_CACHE_DIR = ".cache"
+# The code that builds the frame is part of the cache key too, so a cached frame is rebuilt when it changes
+FEATURE_CODE_FILES = [os.path.abspath(__file__), os.path.abspath(artifacts.__file__)]
+
+# Numeric columns used by the regression, PCA, and clustering analyses
+FEATURES = ['ProjectStartYear', 'ProjectEndYear', 'OutputYear', 'OutputMonth']
+
+# Month name to number mapping
+MONTH_MAP = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
+# Stand-in rows used when an input file is missing
+DUMMY_DATA = {
+    'ProjectID': ['5', '18', '57'],
+    'ProjectStartYear': [2001, 2006, 2001],
+    'ProjectEndYear': [2004, '2006', 2001],
+    'OutputYear': [2004, 2008, 2002],
+    'OutputMonth': ['May', 'February', np.nan],
+    'OutputTitle': [
+        'Entry, Expansion, and Intensity in the U.S. Export Boom',
+        'Wage and Productivity Stability in U.S. Manufacturing Plants',
+        'Explaining Home Bias in Consumption'
+    ]
+}
+
+_memo = {}
+
+
+def input_fingerprint(files=INPUT_FILES, code_files=FEATURE_CODE_FILES):
+    """
+    Hashes the contents of the input files (or the fact that one is missing) and of the code that reads them
+    """
+    digest = hashlib.sha256()
+    for code_file in code_files:
+        with open(code_file, "rb") as f:
+            digest.update(f.read())
+    for file in files:
+        digest.update(file.encode("utf-8"))
+        if not os.path.exists(file):
+            digest.update(b"missing")
+            continue
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_input(file):
+    """
+    Reads one input file, falling back on dummy data if it is missing
+    """
+    try:
+        if file.endswith(".xlsx"):
+            return pd.read_excel(file)
+        return read_table(file)
+    except FileNotFoundError:
+        print(f"Warning: {file} not found. Using dummy data.")
+        return pd.DataFrame(DUMMY_DATA)
+
+
+def build_feature_frame(files=INPUT_FILES):
+    """
+    Merges and deduplicates the input files, converts month names to numbers,
+    and types the feature columns as numbers
+    """
+    df = pd.concat([read_input(file) for file in files], ignore_index=True)
+    df = df.drop_duplicates(subset=['ProjectID', 'OutputTitle']).reset_index(drop=True)
+
+    # Check if required columns exist
+    missing_cols = [col for col in FEATURES + ['OutputTitle'] if col not in df.columns]
+    if missing_cols:
+        print(f"Error: Missing columns {missing_cols}. Using empty values for missing columns.")
+        for col in missing_cols:
+            df[col] = np.nan
+
+    # Convert month names to numbers
+    df['OutputMonth'] = df['OutputMonth'].astype(str).str.lower().map(MONTH_MAP).fillna(df['OutputMonth'])
+
+    # Handle missing values and data types
+    for col in FEATURES:
+        values = pd.to_numeric(df[col], errors='coerce')
+        # Nullable integers read from Parquet become plain floats, as the same column read from CSV would be
+        df[col] = values.astype(float) if pd.api.types.is_extension_array_dtype(values) else values
+    df['OutputMonth'] = df['OutputMonth'].fillna(df['OutputMonth'].median())
+    return df
+
+
+def load_feature_frame(files=INPUT_FILES, use_cache=True):
+    """
+    Returns the merged feature frame, built once per process and cached on disk
+    under a hash of the input files' contents and of this module's code. Callers must not modify it in place.
+    """
+    files = [artifact_path(file) for file in files]
+    key = input_fingerprint(files)
+    if key in _memo:
+        return _memo[key]
+
+    cache_file = os.path.join(FEATURE_CACHE_DIR, f"feature_frame_{key[:16]}.pkl")
+    df = None
+    if use_cache and os.path.exists(cache_file):
+        try:
+            df = pd.read_pickle(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            df = None
+
+    if df is None:
+        df = build_feature_frame(files)
+        if use_cache:
+            os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+            # Write then rename, so processes loading the frame at the same time never see a partial file
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            df.to_pickle(tmp_file)
+            os.replace(tmp_file, cache_file)
+
+    _memo[key] = df
+    return df
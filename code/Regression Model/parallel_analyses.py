@@ -0,0 +1,157 @@
+import importlib
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def nullable_numeric(values):
+    """
+    Whether a column has a nullable extension dtype over NumPy numbers or booleans (Int64, Float64, boolean,
+        or the pyarrow-backed equivalents)
+        """
+    numpy_dtype = getattr(values.dtype, "numpy_dtype", None)
+    return pd.api.types.is_extension_array_dtype(values) and numpy_dtype is not None and numpy_dtype.kind in "biuf"
+
+
+def share_frame(df):
+    """
+    Copies a DataFrame into one shared memory block so worker processes can map it instead of unpickling it.
+        Numeric columns are stored as raw arrays; nullable numeric columns (Int64 and the like) as raw arrays with
+        missing values zeroed plus a missing-value mask; text columns as UTF-8 bytes plus offsets and a missing-value mask.
+        Returns the SharedMemory (the caller must close and unlink it) and a small picklable layout spec
+        """
+    parts, layout = [], []
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+            parts.append(values.to_numpy())
+            layout.append((column, "numeric", str(values.dtype)))
+        elif nullable_numeric(values):
+            numpy_dtype = values.dtype.numpy_dtype
+            parts += [values.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0)), values.isna().to_numpy()]
+            layout.append((column, "nullable", str(values.dtype)))
+        else:
+            missing = values.isna().to_numpy()
+            encoded = [b"" if m else str(v).encode("utf-8") for v, m in zip(values, missing)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in encoded], out=offsets[1:])
+            parts += [offsets, missing, np.frombuffer(b"".join(encoded), dtype=np.uint8)]
+            layout.append((column, "text", None))
+
+    spans, size = [], 0
+    for part in parts:
+        size = -(-size // 8) * 8  # 8-byte align each array
+        spans.append((size, str(part.dtype), part.shape[0]))
+        size += part.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for part, (offset, dtype, length) in zip(parts, spans):
+        np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset)[:] = part
+    return shm, {"name": shm.name, "layout": layout, "spans": spans, "index": df.index}
+
+
+def nullable_array(data, missing, dtype):
+    """
+    Rebuilds a nullable numeric column from its values and missing-value mask, without copying either
+    """
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.ArrowDtype):
+        import pyarrow as pa
+
+        return pd.arrays.ArrowExtensionArray(pa.array(data, mask=missing, type=dtype.pyarrow_dtype))
+    return dtype.construct_array_type()(data, missing)
+
+
+def attach_frame(spec, columns=None):
+    """
+    Rebuilds the DataFrame described by spec on top of the shared block, with only the given columns if any
+        (in the frame's order; names it does not have are left out).
+        Numeric columns are read-only views of shared memory; text columns are decoded into objects
+        """
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    arrays = []
+    for offset, dtype, length in spec["spans"]:
+        array = np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays.append(array)
+
+    wanted = None if columns is None else set(columns)
+    frame, position = {}, 0
+    for column, kind, dtype in spec["layout"]:
+        width = {"numeric": 1, "nullable": 2, "text": 3}[kind]
+        parts, position = arrays[position:position + width], position + width
+        if wanted is not None and column not in wanted:
+            continue
+        if kind == "numeric":
+            frame[column] = parts[0]
+        elif kind == "nullable":
+            frame[column] = nullable_array(parts[0], parts[1], dtype)
+        else:
+            offsets, missing, data = parts
+            raw = data.tobytes()
+            frame[column] = np.array(
+                [None if m else raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i, m in enumerate(missing)],
+                dtype=object,
+            )
+    return shm, pd.DataFrame(frame, index=spec["index"], copy=False)
+
+
+def init_worker():
+    """
+    Workers have no display, so figures are rendered with Agg and saved rather than shown
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def run_analysis(module_name, spec):
+    """
+    Runs one analysis module's main() on the shared frame in a worker process. Only the columns the module
+        lists in COLUMNS are attached (every column if it has no such list).
+        Returns (elapsed seconds, error traceback or None) instead of raising, so one failure cannot stop the others
+        """
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    shm, df = None, None
+    try:
+        module = importlib.import_module(module_name)
+        shm, df = attach_frame(spec, getattr(module, "COLUMNS", None))
+        module.main(df)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        plt.close("all")
+        del df
+        if shm is not None:
+            shm.close()
+    return time.perf_counter() - start, error
+
+
+def run_parallel(df, analyses, max_workers=None):
+    """
+    Runs the analyses ({name: module name}) at the same time in a process pool, all reading one shared copy of df.
+        Returns {name: (elapsed seconds, error traceback or None)}
+        """
+    shm, spec = share_frame(df)
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or len(analyses), initializer=init_worker) as executor:
+            futures = {executor.submit(run_analysis, module_name, spec): name for name, module_name in analyses.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    # The worker process itself died
+                    results[name] = (float("nan"), traceback.format_exc())
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
@@ -1,72 +1,278 @@
-import pandas as pd
-from enrich_all_csv_files import enrich_csv
-from build_metadata import build_project_metadata_dict
-from filter_all_csv_files import filter_csv
-from visualizations import visualize_csv
-# Importing Section 2 scripts
-from regression_model import main as run_regression
-from PCA import main as run_pca
-from clustering_techniques import main as run_clustering
-from text_processing import main as run_text_processing
-
-def load_and_normalize_title(filepath):
-    df = pd.read_csv(filepath)
-    for col in ["title", "Title", "OutputTitle"]:
-        if col in df.columns:
-            df["title"] = df[col]
-            df["normalized_title"] = df[col].astype(str).str.lower().str.strip()
-            return df
-    raise ValueError(f"No title column found in {filepath}")
-
-# List of files
-files = [f"group{i}.csv" for i in range(1, 9)]
-
-# Load and normalize "title" in files
-all_dfs = [load_and_normalize_title(file) for file in files]
-
-# Concatenate and remove duplicates
-combined_df = pd.concat(all_dfs, ignore_index=True)
-deduped_df = combined_df.drop_duplicates(subset="normalized_title").reset_index(drop=True)
-deduped_df["title"] = deduped_df["normalized_title"]
-
-enrich_csv(deduped_df, "Group4_Enriched.csv")
-filter_csv("Group4_Enriched.csv", "ResearchOutputs_Group4.csv")
-visualize_csv("ResearchOutputs_Group4.csv")
-
-# Download NLTK resources for text processing
-try:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-    nltk.download('stopwords')
-    print("NLTK resources downloaded successfully")
-except Exception as e:
-    print(f"Error downloading NLTK resources: {e}")
-
-# Bullet Point 1: Regression Modeling
-try:
-    run_regression()
-    print("Regression modeling completed. Figure saved as regression_plot.png")
-except Exception as e:
-    print(f"Error in regression modeling: {e}")
-
-# Bullet Point 2: PCA Analysis
-try:
-    run_pca()
-    print("PCA analysis completed. Figure saved as pca_plot.png")
-except Exception as e:
-    print(f"Error in PCA analysis: {e}")
-
-# Bullet Point 3: Clustering Analysis
-try:
-    run_clustering()
-    print("Clustering analysis completed. Figure saved as clustering_plot.png")
-except Exception as e:
-    print(f"Error in clustering analysis: {e}")
-
-# Bullet Point 4: Text Processing
-try:
-    run_text_processing()
-    print("Text processing completed. Figure saved as text_plot.png")
-except Exception as e:
-    print(f"Error in text processing: {e}")Outputs_Group4.csv")
-visualize_csv("ResearchOutputs_Group4.csv")
\ No newline at end of file
+import argparse
+import os
+import sys
+from functools import partial
+
+# The stage modules live in the "Input Processing" and "Regression Model" folders
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(CODE_DIR, "Input Processing"), os.path.join(CODE_DIR, "Regression Model")]
+
+# Section 2 analyses: module name and description for each
+ANALYSES = {
+    "regression": ("regression_model", "Regression modeling"),
+    "pca": ("PCA", "PCA analysis"),
+    "clustering": ("clustering_techniques", "Clustering analysis"),
+    "text": ("text_processing", "Text processing"),
+}
+STAGES = ["enrich", "filter", "visualize", *ANALYSES]
+
+# Files passed between stages. The .csv artifacts are written as .parquet instead when that format is chosen
+GROUP_FILES = [f"group{i}.csv" for i in range(1, 9)]
+GROUP_CHUNK_SIZE = 50_000
+TITLE_COLUMNS = ["title", "Title", "OutputTitle"]  # The first of these a group file has is used
+DOI_COLUMNS = ["doi", "DOI"]
+ENRICHED_FILE = "Group4_Enriched.csv"
+ENRICHED_AUTHORS_FILE = "Group4_Enriched_Authors.csv"
+OUTPUTS_FILE = "ResearchOutputs_Group4.csv"
+OUTPUTS_AUTHORS_FILE = "ResearchOutputs_Group4_Authors.csv"
+METADATA_FILE = "ProjectsAllMetadata.xlsx"
+# Local output tables whose titles are indexed, so enrichment resolves them without the APIs
+LOCAL_TITLE_SOURCES = ["2024 ResearchOutput.xlsx"]
+GRAPHS_DIR = "Graphs"
+GRAPH_FILES = [os.path.join(GRAPHS_DIR, f"{name}.png") for name in ["Top10_RDCS", "PublicationsPerYear", "Top10_Prolific_Authors",
+                                                                    "Distribution_of_Output_Types", "Top10_Projects_by_Publications"]]
+SUMMARY_FILE = os.path.join(GRAPHS_DIR, "dashboard_summary.json")
+ANALYSIS_INPUTS = [OUTPUTS_FILE, ENRICHED_FILE, "2024 ResearchOutput.xlsx"]
+ANALYSIS_OUTPUTS = {
+    "regression": ["Regression_Results.csv"],
+    "pca": ["PCA_Results.csv"],
+    "clustering": ["Clustering_Results.csv"],
+    "text": ["Text_Processing_Results.csv"],
+}
+
+
+def read_group_file(filepath, chunksize=GROUP_CHUNK_SIZE):
+    """
+    Yields a group file in chunks of title, normalized_title (see normalization.py), and doi,
+        reading only the title and DOI columns
+        """
+    import pandas as pd
+    from normalization import normalize_titles
+
+    reader = pd.read_csv(filepath, usecols=lambda column: column in TITLE_COLUMNS + DOI_COLUMNS, dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        title_column = next((column for column in TITLE_COLUMNS if column in chunk.columns), None)
+        if title_column is None:
+            raise ValueError(f"No title column found in {filepath}")
+        doi_column = next((column for column in DOI_COLUMNS if column in chunk.columns), None)
+        yield pd.DataFrame({
+            "title": chunk[title_column],
+            "normalized_title": normalize_titles(chunk[title_column]),
+            "doi": chunk[doi_column] if doi_column else None,
+        })
+
+
+def unique_group_chunks(files, index):
+    """
+    Streams the group files through the near-duplicate index and yields only the records that start a new cluster,
+        with the normalized title as the title to search. Only the index is kept in memory, not the files
+        """
+    read = kept = 0
+    for file in files:
+        for chunk in read_group_file(file):
+            is_new = [index.add(title, doi) == len(index) - 1 for title, doi in zip(chunk["normalized_title"], chunk["doi"])]
+            unique = chunk[is_new]
+            read, kept = read + len(chunk), kept + len(unique)
+            if len(unique):
+                yield unique.assign(title=unique["normalized_title"])
+    print(f"{read} titles in the group files, {kept} after removing duplicates")
+
+
+def group_fingerprint(files=GROUP_FILES):
+    """
+    Identifies the titles unique_group_chunks yields: the group files' contents and the code that reads and dedupes them.
+        A checkpointed enrichment only resumes while this is unchanged
+        """
+    import hashlib
+    from pipeline import file_digest
+
+    paths = list(files) + code_files("Input Processing", "dedupe.py", "normalization.py") + [os.path.join(CODE_DIR, "main.py")]
+    return hashlib.sha256("".join(f"{path}\0{file_digest(path)}\0" for path in paths).encode("utf-8")).hexdigest()
+
+
+def run_enrich(concurrency=None, checkpoint=False, hedge_delay=None):
+    """
+    Streams the group files, drops duplicate and near-duplicate titles as they arrive, and enriches the rest.
+        concurrency, checkpoint, and hedge_delay are passed on to enrich_csv.
+        Request and match metrics go to a JSON file next to the enriched file, and to the Prometheus text file
+        named by $ENRICH_METRICS_PROMETHEUS if it is set
+        """
+    from dedupe import NearDuplicateIndex
+    from enrich_all_csv_files import enrich_csv
+    from enrichment_metrics import PROMETHEUS_FILE_ENV
+
+    enrich_csv(unique_group_chunks(GROUP_FILES, NearDuplicateIndex()), artifact(ENRICHED_FILE), concurrency=concurrency,
+               checkpoint=checkpoint, hedge_delay=hedge_delay, local_sources=LOCAL_TITLE_SOURCES,
+               prometheus_path=os.environ.get(PROMETHEUS_FILE_ENV), input_fingerprint=group_fingerprint())
+
+
+def run_filter():
+    from filter_all_csv_files import filter_csv
+
+    filter_csv(artifact(ENRICHED_FILE), artifact(OUTPUTS_FILE))
+
+
+def run_visualize(force=False):
+    """
+    Saves the graphs; force redraws them even where render_graphs' own cache says they are unchanged
+    """
+    from visualization import render_graphs
+
+    render_graphs(artifact(OUTPUTS_FILE), GRAPHS_DIR, force=force)
+
+
+def run_analysis(name):
+    """
+    Runs one Section 2 analysis on the merged feature frame
+    """
+    import importlib
+    from data_loader import load_feature_frame
+
+    module_name, description = ANALYSES[name]
+    importlib.import_module(module_name).main(load_feature_frame())
+    print(f"{description} completed.")
+
+
+def run_analyses_parallel(names):
+    """
+    Runs the chosen analyses at the same time, one process each, all reading one shared copy of the feature frame.
+        A failing analysis does not stop the others; the stage fails afterwards if any of them did
+        """
+    from data_loader import load_feature_frame
+    from parallel_analyses import run_parallel
+
+    results = run_parallel(load_feature_frame(), {name: ANALYSES[name][0] for name in names})
+    failed = []
+    for name in names:
+        elapsed, error = results[name]
+        description = ANALYSES[name][1]
+        if error:
+            failed.append(name)
+            print(f"{description} failed after {elapsed:.1f}s:\n{error}")
+        else:
+            print(f"{description} completed in {elapsed:.1f}s.")
+    if failed:
+        raise RuntimeError(f"Analyses failed: {', '.join(failed)}")
+
+
+def artifact(path):
+    """
+    The path of a stage artifact in the configured format
+    """
+    from artifacts import artifact_path
+
+    return artifact_path(path)
+
+
+def code_files(folder, *names):
+    return [os.path.join(CODE_DIR, folder, name) for name in names]
+
+
+def build_stages(parallel_analyses=None, enrich_options=None, force=()):
+    """
+    Declares each stage with the files it reads and writes; the runner derives the order from them.
+        parallel_analyses, if given, lists analyses to run together as one "analysis" stage instead of one stage each;
+        enrich_options are keyword arguments for run_enrich, and force the stages forced to rerun
+        (the visualize stage then also redraws graphs it has cached itself)
+        """
+    from pipeline import Stage
+
+    enriched, enriched_authors = artifact(ENRICHED_FILE), artifact(ENRICHED_AUTHORS_FILE)
+    outputs, outputs_authors = artifact(OUTPUTS_FILE), artifact(OUTPUTS_AUTHORS_FILE)
+    analysis_inputs = [artifact(path) for path in ANALYSIS_INPUTS]
+    analysis_outputs = {name: [artifact(path) for path in paths] for name, paths in ANALYSIS_OUTPUTS.items()}
+    artifact_code = code_files("Input Processing", "artifacts.py")
+
+    stages = [
+        Stage("enrich", partial(run_enrich, **(enrich_options or {})), inputs=GROUP_FILES + LOCAL_TITLE_SOURCES, outputs=[enriched, enriched_authors],
+              # Every module enrich imports, and main.py itself, which picks the titles enrich is given
+              code=code_files("Input Processing", "enrich_all_csv_files.py", "output_classification.py", "author_table.py",
+                              "artifacts.py", "dedupe.py", "citations.py", "normalization.py", "title_index.py",
+                              "arxiv_atom.py", "enrichment_metrics.py", "async_enrichment.py", "response_cache.py",
+                              "http_session.py", "checkpoint.py") + [os.path.join(CODE_DIR, "main.py")]),
+        Stage("filter", run_filter, inputs=[enriched, enriched_authors, METADATA_FILE], outputs=[outputs, outputs_authors],
+              code=code_files("Input Processing", "filter_all_csv_files.py", "build_metadata.py", "author_table.py",
+                              "artifacts.py", "normalization.py")),
+        Stage("visualize", partial(run_visualize, force="all" in force or "visualize" in force), inputs=[outputs, outputs_authors], outputs=GRAPH_FILES + [SUMMARY_FILE],
+              code=code_files("Input Processing", "visualization.py", "dashboard_summary.py", "author_table.py",
+                              "artifacts.py")),
+    ]
+    if parallel_analyses:
+        stages.append(Stage("analysis", partial(run_analyses_parallel, tuple(parallel_analyses)), inputs=analysis_inputs,
+                            outputs=[path for name in parallel_analyses for path in analysis_outputs[name]],
+                            code=code_files("Regression Model", *(f"{ANALYSES[name][0]}.py" for name in parallel_analyses),
+                                            "data_loader.py", "parallel_analyses.py") + artifact_code))
+        return stages
+    for name, (module_name, _) in ANALYSES.items():
+        stages.append(Stage(name, partial(run_analysis, name), inputs=analysis_inputs, outputs=analysis_outputs[name],
+                            code=code_files("Regression Model", f"{module_name}.py", "data_loader.py") + artifact_code))
+    return stages
+
+
+def main(argv=None):
+    from pipeline import run_pipeline
+
+    choices = STAGES + ["analysis"]
+    parser = argparse.ArgumentParser(description="Runs the FSRDC research output pipeline. "
+                                                 "Stages whose inputs and code are unchanged since their last run are skipped.")
+    parser.add_argument("--stage", action="append", choices=choices,
+                        help="only run this stage; repeat to run several ('analysis' means all four analyses). Default: every stage")
+    parser.add_argument("--skip", action="append", default=[], choices=choices, help="leave this stage out")
+    parser.add_argument("--force", action="append", default=[], choices=choices + ["all"],
+                        help="rerun this stage even if it is up to date ('all' reruns every stage)")
+    parser.add_argument("--workers", type=int, default=4, help="how many independent stages may run at once")
+    parser.add_argument("--parallel-analyses", action="store_true",
+                        help="run the selected analyses as one stage, in parallel processes sharing the feature frame")
+    parser.add_argument("--format", choices=["csv", "parquet"],
+                        help="file format of the artifacts passed between stages (default: $PIPELINE_ARTIFACT_FORMAT or csv)")
+    parser.add_argument("--metrics-prometheus", metavar="PATH",
+                        help="also write the enrich stage's request metrics to PATH as a Prometheus text file")
+    parser.add_argument("--concurrency", type=int, metavar="N",
+                        help="search up to N titles at once during enrich, within each API's rate limit (default: one at a time)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="journal enrich's progress so an interrupted run resumes where it stopped")
+    parser.add_argument("--hedge-delay", type=float, metavar="SECONDS",
+                        help="query the fallback APIs SECONDS after the previous one instead of waiting for it to fail "
+                             "(0 queries them all at once)")
+    args = parser.parse_args(argv)
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.hedge_delay is not None and args.hedge_delay < 0:
+        parser.error("--hedge-delay cannot be negative")
+
+    if args.format:
+        from artifacts import ARTIFACT_FORMAT_ENV
+
+        # Set in the environment so the stage worker processes use it too
+        os.environ[ARTIFACT_FORMAT_ENV] = args.format
+    if args.metrics_prometheus:
+        from enrichment_metrics import PROMETHEUS_FILE_ENV
+
+        os.environ[PROMETHEUS_FILE_ENV] = os.path.abspath(args.metrics_prometheus)
+
+    def expand(names):
+        return [n for name in names for n in (ANALYSES if name == "analysis" else [name])]
+
+    only, skip, force = expand(args.stage) if args.stage else None, expand(args.skip), expand(args.force)
+    parallel = None
+    if args.parallel_analyses:
+        parallel = [name for name in ANALYSES if (only is None or name in only) and name not in skip]
+
+    if parallel:
+        # The chosen analyses collapse into the single "analysis" stage
+        def collapse(names):
+            return list(dict.fromkeys("analysis" if name in ANALYSES else name for name in names))
+
+        only = collapse(only) if only is not None else None
+        skip = [name for name in collapse(skip) if name != "analysis"]
+        force = collapse(force)
+
+    enrich_options = {"concurrency": args.concurrency, "checkpoint": args.checkpoint, "hedge_delay": args.hedge_delay}
+    status = run_pipeline(build_stages(parallel, enrich_options, force), only=only, skip=skip, force=force, max_workers=args.workers)
+    failed = [name for name, result in status.items() if result in ("failed", "blocked")]
+    if failed:
+        sys.exit(f"Stages not completed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
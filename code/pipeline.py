@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Where the fingerprint each stage last ran with is kept
+DEFAULT_STATE_FILE = ".cache/pipeline_state.json"
+
+
+class Stage:
+    """
+    One pipeline step: a picklable zero-argument function plus the files it reads and writes.
+        code lists the source files whose changes should also rerun the stage
+        """
+
+    def __init__(self, name, func, inputs=(), outputs=(), code=(), deps=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.deps = set(deps)
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's contents, or "missing" if it does not exist
+    """
+    if not os.path.exists(path):
+        return "missing"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage):
+    """
+    Hashes everything a stage's result depends on: its name, its inputs, and its code
+    """
+    digest = hashlib.sha256(stage.name.encode("utf-8"))
+    for path in stage.inputs + stage.code:
+        digest.update(f"{path}\0{file_digest(path)}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def resolve_dependencies(stages):
+    """
+    Adds an edge from every stage that writes a file to every stage that reads it
+    """
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    for stage in stages:
+        stage.deps |= {producers[path] for path in stage.inputs if path in producers and producers[path] != stage.name}
+
+    # Reject cycles up front rather than deadlocking later
+    done, visiting = set(), set()
+    by_name = {stage.name: stage for stage in stages}
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline has a dependency cycle through '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for stage in stages:
+        visit(stage.name)
+
+
+def run_stage(func):
+    """
+    Runs one stage function in a worker process and returns its wall time
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_pipeline(stages, only=None, skip=(), force=(), state_file=DEFAULT_STATE_FILE, max_workers=4):
+    """
+    Runs the stages in dependency order, starting independent stages at the same time in worker processes.
+        A stage is skipped when its fingerprint matches the last successful run and its outputs are unchanged.
+        only limits the run to the named stages (their upstream stages are not rerun), skip leaves stages out,
+        and force reruns stages even when they are up to date ("all" forces every stage).
+        Returns {stage name: "ran", "cached", "skipped", "failed", or "blocked"}
+        """
+    resolve_dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    for name in list(only or []) + list(skip) + [f for f in force if f != "all"]:
+        if name not in by_name:
+            raise ValueError(f"Unknown stage '{name}'")
+
+    selected = {name for name in by_name if (not only or name in only) and name not in skip}
+    force_all = "all" in force
+
+    state = {}
+    if os.path.exists(state_file):
+        with open(state_file, encoding="utf-8") as f:
+            state = json.load(f)
+
+    def save_state():
+        if os.path.dirname(state_file):
+            os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        tmp = state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, state_file)
+
+    def up_to_date(stage, fingerprint):
+        recorded = state.get(stage.name)
+        return (recorded is not None and recorded["fingerprint"] == fingerprint
+                and all(recorded["outputs"].get(path) == file_digest(path) for path in stage.outputs))
+
+    status = {name: "skipped" for name in by_name if name not in selected}
+    running, fingerprints = {}, {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while len(status) < len(by_name):
+            for name in [n for n in by_name if n in selected]:
+                stage = by_name[name]
+                if name in status or name in running.values():
+                    continue
+                dep_status = [status.get(dep) for dep in stage.deps]
+                if any(s in ("failed", "blocked") for s in dep_status):
+                    status[name] = "blocked"
+                    print(f"[{name}] not run: an upstream stage failed")
+                    continue
+                if any(s is None for s in dep_status):
+                    continue  # Still waiting on an upstream stage
+
+                fingerprint = stage_fingerprint(stage)
+                if not (force_all or name in force) and up_to_date(stage, fingerprint):
+                    status[name] = "cached"
+                    print(f"[{name}] up to date, skipping")
+                    continue
+                print(f"[{name}] running")
+                running[executor.submit(run_stage, stage.func)] = name
+                fingerprints[name] = fingerprint
+                state.pop(name, None)
+
+            if not running:
+                continue  # Stages were resolved without running anything; look again
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = by_name[name]
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    print(f"[{name}] failed: {e}")
+                    continue
+                status[name] = "ran"
+                state[name] = {
+                    "fingerprint": fingerprints[name],
+                    "outputs": {path: file_digest(path) for path in stage.outputs},
+                }
+                save_state()
+                print(f"[{name}] done in {elapsed:.1f}s")
+
+    return status
@@ -0,0 +1,70 @@
+"""
+Times the row-wise OutputType/OutputStatus functions against the column-wise classify_outputs on synthetic citations.
+    Run from code/: python tests/bench_output_classification.py [rows]
+    """
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Input Processing"))
+
+from output_classification import classify_outputs, infer_output_status, infer_output_type
+
+VENUES = ["Journal of Econometrics", "American Economic Review", "arXiv", None, "Economics Letters", "Census Working Papers", "",
+          "Review of Economic Studies", "Handbook of Labor Economics", "Monthly Labor Review"]
+KINDS = ["media", "book chapter", "software", "dataset", "blog"]
+
+
+def citations(count, seed=0):
+    """
+    (OutputBiblio, OutputVenue) columns shaped like make_apa_citation's output: journal articles, arXiv and SSRN papers,
+        and undated citations of other kinds
+        """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        venue, kind = rng.choice(VENUES), rng.random()
+        if kind < 0.5 and venue:
+            rows.append((f'Doe, J., & Smith, A. ({2000 + i % 20}). "Title number {i} about plants and firms". *{venue}*, 12(3), 45.', venue))
+        elif kind < 0.7:
+            rows.append((f'Doe, J. ({2000 + i % 20}). "Paper {i}" (arXiv:2101.{i:05d}). *arXiv*.', "arXiv"))
+        elif kind < 0.8:
+            rows.append((f'Doe, J. ({2000 + i % 20}). "Paper {i}". *SSRN Working Paper Series*.', venue))
+        else:
+            rows.append((f'Doe, J. (n.d.). "A study of {rng.choice(KINDS)} {i}".', venue))
+    return pd.DataFrame(rows, columns=["OutputBiblio", "OutputVenue"])
+
+
+def best_time(func, repeat=3):
+    """
+    The fastest of repeat runs, and the last result
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def row_wise(df):
+    types = df.apply(infer_output_type, axis=1)
+    statuses = df.assign(OutputType=types).apply(infer_output_status, axis=1)
+    return types, statuses
+
+
+def main(count=100_000):
+    df = citations(count)
+    row_seconds, (types, statuses) = best_time(lambda: row_wise(df))
+    column_seconds, (column_types, column_statuses) = best_time(lambda: classify_outputs(df["OutputBiblio"], df["OutputVenue"]))
+    same = column_types.tolist() == types.tolist() and column_statuses.tolist() == statuses.tolist()
+    print(f"{count} rows: row-wise {row_seconds:.2f}s, column-wise {column_seconds:.3f}s, "
+          f"{row_seconds / column_seconds:.1f}x faster, same labels: {same}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
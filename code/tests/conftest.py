@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# The modules under test live in the "Input Processing" and "Regression Model" folders, as main.py sets up
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [CODE_DIR, os.path.join(CODE_DIR, "Input Processing"), os.path.join(CODE_DIR, "Regression Model")]
+
+
+class OfflineSession:
+    """
+    Stands in for SessionPool: every request fails, so titles that are not resolved locally stay unmatched
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get(self, url, **kwargs):
+        import requests
+
+        raise requests.ConnectionError("offline")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    import enrich_all_csv_files
+    import http_session
+
+    monkeypatch.setattr(http_session, "SessionPool", OfflineSession)
+    # No real requests are sent, so nothing needs pacing
+    monkeypatch.setattr(enrich_all_csv_files, "API_LIMITS", {source: {"rate": 1000, "concurrency": 10}
+                                                             for source in enrich_all_csv_files.API_LIMITS})
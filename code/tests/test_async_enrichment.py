@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from async_enrichment import RateLimiter, hedged_first
+from enrich_all_csv_files import enrich_csv
+
+
+def drained_limiter():
+    """
+    A one-slot limiter whose only token is spent, so the next acquire would wait ten seconds
+    """
+    limiter = RateLimiter(rate=0.1, concurrency=1)
+    limiter.acquire()
+    limiter.release()
+    return limiter
+
+
+def test_cancelled_acquire_gives_up_and_keeps_its_slot_free():
+    limiter, cancel = drained_limiter(), threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    start = time.monotonic()
+    assert limiter.acquire(cancel) is False
+    assert time.monotonic() - start < 1
+    # The slot was handed back, so a cancelled waiter does not block the next caller
+    assert limiter.slots.acquire(timeout=0)
+
+
+def test_losing_hedges_stop_waiting_for_the_limiter():
+    limiter, sent = drained_limiter(), []
+
+    def primary(cancel):
+        time.sleep(0.05)
+        return "primary"
+
+    def fallback(cancel):
+        if not limiter.acquire(cancel):
+            return None
+        limiter.release()
+        sent.append("fallback")
+        return "fallback"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        start = time.monotonic()
+        assert hedged_first([primary, fallback], 0, executor) == "primary"
+    # Leaving the pool waits for the fallback, which gave up instead of waiting out the ten-second token
+    assert time.monotonic() - start < 1
+    assert sent == []
+
+
+def test_hedge_answer_follows_priority_order():
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        calls = [lambda cancel: time.sleep(0.1), lambda cancel: "second", lambda cancel: "third"]
+        assert hedged_first(calls, 0, executor) == "second"
+        assert hedged_first([lambda cancel: None] * 3, 0.01, executor) is None
+
+
+def test_sequential_enrich_is_paced_only_by_the_limiters(tmp_path, offline, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    titles = pd.DataFrame({"title": [f"A title nobody has {i}" for i in range(5)]})
+    enrich_csv(titles, str(tmp_path / "enriched.csv"), cache_path=None, title_index_path=None)
+    assert sleeps == []
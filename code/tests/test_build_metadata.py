@@ -0,0 +1,32 @@
+import pandas as pd
+
+import build_metadata
+
+
+def write_workbook(path):
+    pd.DataFrame({"Proj ID": [5, 18], "Status": ["Completed", "Active"], "Title": ["Exports", "Wages"], "RDC": ["Boston", "Triangle"],
+                  "Start Year": [2001, 2006], "End Year": [2004, 2008], "PI": ["Doe", "Smith"],
+                  "Abstract": ["Firms and exports of plants", None]}).to_excel(path, sheet_name="All Metadata", index=False)
+
+
+def test_metadata_cache_is_rebuilt_when_the_code_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_workbook("metadata.xlsx")
+
+    projects = build_metadata.build_project_metadata_dict("metadata.xlsx")
+    assert projects["0005"]["AbstractKeywords"] == frozenset({"firms", "exports", "plants"})
+
+    # Same code and workbook: served from the cache without reading the workbook
+    def no_read(*args, **kwargs):
+        raise AssertionError("workbook read again")
+
+    monkeypatch.setattr(pd, "read_excel", no_read)
+    cached = build_metadata.build_project_metadata_dict("metadata.xlsx")
+    assert {proj_id: project["ProjectTitle"] for proj_id, project in cached.items()} == {"0005": "Exports", "0018": "Wages"}
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+
+    # Changed fields (and so changed code): the cached dict is not reused
+    monkeypatch.setattr(build_metadata, "METADATA_FIELDS", {"ProjectTitle": "Title", "Abstract": "Abstract"})
+    monkeypatch.setattr(build_metadata, "code_sha256", lambda: "changed")
+    assert set(build_metadata.build_project_metadata_dict("metadata.xlsx")["0018"]) == {"ProjectTitle", "Abstract", "AbstractKeywords"}
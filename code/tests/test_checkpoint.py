@@ -0,0 +1,80 @@
+import pandas as pd
+
+from enrich_all_csv_files import enrich_csv
+
+
+def run(titles, output):
+    enrich_csv(pd.DataFrame({"title": titles}), output, concurrency=2, cache_path=None, title_index_path=None, checkpoint=True)
+    return pd.read_csv(output, keep_default_na=False)
+
+
+def interrupt(output, written):
+    """
+    Cuts the journal back to its header and the first `written` records, as if the run had stopped there
+    """
+    journal = output + ".journal"
+    with open(journal) as f:
+        lines = f.readlines()
+    with open(journal, "w") as f:
+        f.writelines(lines[:1 + written])
+
+
+def test_resume_on_the_same_input_finishes_the_run(tmp_path, offline):
+    output = str(tmp_path / "enriched.csv")
+    titles = ["Alpha paper", "Beta paper", "Alpha paper", "Gamma paper"]
+    expected = run(titles, output)
+    interrupt(output, 2)
+
+    resumed = run(titles, output)
+    pd.testing.assert_frame_equal(resumed, expected)
+    assert resumed["OutputID"].tolist() == [0, 1, 2, 3]
+
+
+def test_resume_on_changed_input_starts_over(tmp_path, offline):
+    output = str(tmp_path / "enriched.csv")
+    run(["Alpha paper", "Beta paper", "Gamma paper"], output)
+    interrupt(output, 2)
+
+    rerun = run(["Alpha paper", "Gamma paper", "Delta paper"], output)
+    assert rerun["OutputID"].tolist() == [0, 1, 2]
+    assert len(rerun) == 3
+    authors = pd.read_csv(str(tmp_path / "enriched_Authors.csv"))
+    assert authors["OutputID"].isin(rerun["OutputID"]).all()
+
+
+def test_chunks_without_a_fingerprint_are_not_resumed(tmp_path, offline):
+    output = str(tmp_path / "enriched.csv")
+
+    def chunks():
+        yield pd.DataFrame({"title": ["Alpha paper", "Beta paper"]})
+
+    enrich_csv(chunks(), output, concurrency=2, cache_path=None, title_index_path=None, checkpoint=True)
+    interrupt(output, 1)
+    enrich_csv(chunks(), output, concurrency=2, cache_path=None, title_index_path=None, checkpoint=True)
+    assert pd.read_csv(output)["OutputID"].tolist() == [0, 1]
+
+
+def test_output_ids_stay_unique_across_a_resume_on_changed_input(tmp_path, offline):
+    from normalization import normalize_title
+    from title_index import TitleIndex
+
+    index_path = str(tmp_path / "index.sqlite")
+    index = TitleIndex(index_path)
+    for title in ["Alpha paper", "Beta paper", "Gamma paper", "Delta paper"]:
+        index.add(normalize_title(title), (title, ["Jane Doe", "John Smith"], 2020, 1, "Journal", "1", "2", "3", None, "OpenAlex"))
+    index.close()
+
+    def enrich(titles):
+        enrich_csv(pd.DataFrame({"title": titles}), output, concurrency=3, cache_path=None, title_index_path=index_path, checkpoint=True)
+
+    output = str(tmp_path / "enriched.csv")
+    enrich(["Alpha paper", "Beta paper", "Gamma paper"])
+    interrupt(output, 2)
+    enrich(["Alpha paper", "Delta paper", "Beta paper", "Alpha paper"])
+
+    outputs = pd.read_csv(output)
+    authors = pd.read_csv(str(tmp_path / "enriched_Authors.csv"))
+    assert outputs["OutputID"].is_unique
+    assert outputs["OutputTitle"].tolist() == ["Alpha paper", "Delta paper", "Beta paper", "Alpha paper"]
+    assert not authors.duplicated(["OutputID", "AuthorPosition"]).any()
+    assert sorted(authors["OutputID"].unique()) == sorted(outputs["OutputID"])
@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from citations import apa_citation_column, format_apa_authors, format_apa_authors_column, make_apa_citation, month_name_column, month_number_to_name
+
+MISSING = [None, np.nan, pd.NA]
+AUTHORS = ["Jane Q Doe", "John Smith", "Plato", "  Ada   Lovelace ", "Émile Durkheim", "José Martí", "", None]
+TEXT = ["Trade and Firms", "  Spaced  Title ", "Ünïcode “quoted” title", 'With "quotes"', ""]
+DOIS = ["10.1000/182", " 10.1000/182 ", "https://doi.org/10.1000/183", "10.48550/arXiv.2101.00001", "10.2139/ssrn.123",
+        "10.3386/w2020-nber", "arxiv:2101.00001", "https://example.org/paper"]
+SOURCES = ["OpenAlex", "CrossRef", "arxiv", "arXiv", "Local"]
+
+# (record, citation) pairs that pin down the format itself, not just agreement between the two implementations
+GOLDEN = [
+    ((["Jane Q Doe", "John Smith"], 2020, "Trade and Firms", "Journal of Tests", "1", "2", "3", "10.1000/182", "OpenAlex"),
+     'Doe, J. Q. & Smith, J. (2020). "Trade and Firms". *Journal of Tests*, 1(2), 3. https://doi.org/10.1000/182'),
+    ((["A B", "C D", "E F"], pd.NA, "Plants", pd.NA, pd.NA, pd.NA, pd.NA, "10.48550/arXiv.2101.00001", "arxiv"),
+     'B, A., D, C., & F, E. (n.d.). "Plants" (arXiv:arXiv.2101.00001). *arXiv*. https://doi.org/10.48550/arXiv.2101.00001'),
+    ((["Plato"], 2019, "Wages", "Elsewhere", 4, pd.NA, pd.NA, "10.2139/ssrn.123", "CrossRef"),
+     'Plato (2019). "Wages". *SSRN Working Paper Series*. https://doi.org/10.2139/ssrn.123'),
+    (([], 2018, "Exports", pd.NA, pd.NA, pd.NA, pd.NA, "10.3386/nber.1", "CrossRef"),
+     ' (2018). "Exports". *NBER Working Paper Series*. https://doi.org/10.3386/nber.1'),
+    (([], pd.NA, "", pd.NA, pd.NA, pd.NA, pd.NA, pd.NA, pd.NA),
+     ' (n.d.). "".'),
+]
+
+
+def random_records(count, seed):
+    rng = random.Random(seed)
+
+    def maybe(values):
+        return rng.choice(values + MISSING)
+
+    return [(
+        [rng.choice(AUTHORS) for _ in range(rng.choice([0, 1, 2, 3, 5]))],
+        maybe([2020, 1999, "2021", 2020.0]),
+        maybe(TEXT),
+        maybe(["Journal of Tests", "Review of Plants", ""]),
+        maybe(["12", 3, 4.0]),
+        maybe(["1", 2]),
+        maybe(["45-67", 8]),
+        maybe(DOIS),
+        maybe(SOURCES),
+    ) for _ in range(count)]
+
+
+def column_citations(records):
+    return apa_citation_column(*(list(field) for field in zip(*records))).tolist()
+
+
+def test_golden_citations():
+    records = [record for record, _ in GOLDEN]
+    expected = [citation for _, citation in GOLDEN]
+    assert [make_apa_citation(*record) for record in records] == expected
+    assert column_citations(records) == expected
+
+
+def test_column_citations_match_scalar():
+    records = random_records(20_000, seed=21)
+    assert column_citations(records) == [make_apa_citation(*record) for record in records]
+
+
+def test_authors_column_matches_scalar():
+    author_lists = [record[0] for record in random_records(5000, seed=7)]
+    assert format_apa_authors_column(author_lists).tolist() == [format_apa_authors(authors) for authors in author_lists]
+
+
+def test_month_names_match_scalar():
+    months = [1, 12, 13, 0, "5", "May", 3.0, None, np.nan, pd.NA]
+    names = month_name_column(months).tolist()
+    expected = [month_number_to_name(month) for month in months]
+    assert [name if isinstance(name, str) else None for name in names] == [name if isinstance(name, str) else None for name in expected]
+
+
+def test_empty_batch():
+    assert apa_citation_column(*[[] for _ in range(9)]).tolist() == []
@@ -0,0 +1,24 @@
+import os
+
+import pandas as pd
+
+import data_loader
+
+
+def test_feature_cache_is_keyed_on_the_loader_code(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_loader, "_memo", {})
+    table = tmp_path / "outputs.csv"
+    pd.DataFrame({"ProjectID": ["1"], "ProjectStartYear": [2001], "ProjectEndYear": [2004], "OutputYear": [2004],
+                  "OutputMonth": ["May"], "OutputTitle": ["A"]}).to_csv(table, index=False)
+    loader = tmp_path / "loader.py"
+    loader.write_text("version 1")
+
+    first = data_loader.input_fingerprint([str(table)], [str(loader)])
+    assert data_loader.input_fingerprint([str(table)], [str(loader)]) == first
+    loader.write_text("version 2")
+    assert data_loader.input_fingerprint([str(table)], [str(loader)]) != first
+
+    frame = data_loader.load_feature_frame([str(table)])
+    assert frame["OutputMonth"].tolist() == [5]
+    assert len(os.listdir(tmp_path / data_loader.FEATURE_CACHE_DIR)) == 1
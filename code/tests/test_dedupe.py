@@ -0,0 +1,61 @@
+import numpy as np
+
+from dedupe import BucketTable, NearDuplicateIndex
+from normalization import number_tokens
+
+
+def first_records(titles, dois=None):
+    index = NearDuplicateIndex()
+    return [index.add(title, doi) == i for i, (title, doi) in enumerate(zip(titles, dois or [None] * len(titles)))]
+
+
+def test_titles_differing_only_by_a_year_are_kept():
+    assert first_records(["The Economic Impact of the 2010 Decennial Census Operations",
+                          "The Economic Impact of the 2020 Decennial Census Operations"]) == [True, True]
+
+
+def test_titles_differing_only_by_a_roman_numeral_are_kept():
+    assert first_records(["Productivity Dispersion Across U.S. Manufacturing Plants: Part I",
+                          "Productivity Dispersion Across U.S. Manufacturing Plants: Part II"]) == [True, True]
+
+
+def test_near_identical_titles_are_merged():
+    assert first_records(["Trade, Firms, and the 2010 Census: Part II",
+                          "Trade Firms and the 2010 Census Part II",
+                          "Trade, Firms, and the 2010 Censuses: Part II"]) == [True, False, False]
+
+
+def test_same_doi_is_merged_and_different_dois_are_not():
+    titles = ["Exporters and Wages in U.S. Plants", "Exporters and Wages in US Plants", "Exporters and Wages in U.S. Plants"]
+    assert first_records(titles, ["10.1/a", "10.1/b", "https://doi.org/10.1/a"]) == [True, True, False]
+
+
+def test_number_tokens():
+    assert number_tokens("part ii of the 2010 census") == ("ii", "2010")
+    assert number_tokens("a mix of civil and vivid dim mills") == ()
+    assert number_tokens("volume xiv part iv") == ("xiv", "iv")
+
+
+def test_bucket_table_keeps_every_bucket_as_it_grows():
+    keys = np.random.default_rng(0).integers(1, 1 << 63, 5000, dtype=np.uint64).tolist()
+    table = BucketTable(bits=4)
+    for value, key in enumerate(keys):
+        slots, found = table.lookup([key, key])
+        assert found == [None, None]
+        table.open([key, key], slots, value)
+    assert table.count == len(keys) and len(table.keys) == 8192
+    assert table.lookup(keys)[1] == list(range(len(keys)))
+
+
+def test_duplicates_are_found_after_the_index_grows():
+    titles = [f"measuring productivity dispersion in plant number {i:05d} of the census" for i in range(3000)]
+    index = NearDuplicateIndex()
+    assert all(index.add(title) == i for i, title in enumerate(titles))
+    assert index.add(titles[10] + "s") == 10
+    assert index.add(titles[2990].replace("census", "censuses")) == 2990
+
+
+def test_odd_band_widths():
+    index = NearDuplicateIndex(num_perm=48, bands=16)
+    assert [index.add(title) for title in ["Trade and the Census Part II", "Trade and the Census: Part II",
+                                           "Trade and the Census Part I"]] == [0, 0, 2]
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from enrich_all_csv_files import enrich_csv
+from normalization import normalize_title
+from title_index import TitleIndex
+
+RECORDS = [
+    ("Trade and Firms", ["Jane Q Doe"], 2020, 3, "", "12", "", "45", "10.1000/1", "OpenAlex"),
+    ("NA", ["None"], 2019, None, "Journal of Tests", None, None, None, None, "CrossRef"),
+]
+
+
+@pytest.fixture
+def title_index(tmp_path, offline):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "index.sqlite")
+    index = TitleIndex(path)
+    for record in RECORDS:
+        index.add(normalize_title(record[0]), record)
+    index.close()
+    return path
+
+
+def test_checkpointed_parquet_matches_normal_run(tmp_path, title_index):
+    titles = pd.DataFrame({"title": ["Trade and Firms", "NA", "A title nobody has"]})
+    normal, checkpointed = str(tmp_path / "normal.parquet"), str(tmp_path / "checkpointed.parquet")
+    enrich_csv(titles.copy(), normal, cache_path=None, title_index_path=title_index)
+    enrich_csv(titles.copy(), checkpointed, cache_path=None, title_index_path=title_index, checkpoint=True)
+
+    outputs = pd.read_parquet(normal)
+    pd.testing.assert_frame_equal(outputs, pd.read_parquet(checkpointed))
+    pd.testing.assert_frame_equal(pd.read_parquet(str(tmp_path / "normal_Authors.parquet")),
+                                  pd.read_parquet(str(tmp_path / "checkpointed_Authors.parquet")))
+
+    assert outputs["OutputTitle"].tolist() == ["Trade and Firms", "NA", ""]
+    assert outputs["OutputVenue"].isna().tolist() == [True, False, True]
+    assert outputs["OutputNumber"].isna().all()
+
+
+def test_checkpointed_parquet_leaves_the_csv_artifact_alone(tmp_path, title_index):
+    csv_artifact = tmp_path / "enriched.csv"
+    csv_artifact.write_text("OutputID,OutputTitle\n0,From the CSV run\n")
+    titles = pd.DataFrame({"title": ["Trade and Firms", "A title nobody has"]})
+    enrich_csv(titles, str(tmp_path / "enriched.parquet"), cache_path=None, title_index_path=title_index, checkpoint=True)
+
+    assert csv_artifact.read_text() == "OutputID,OutputTitle\n0,From the CSV run\n"
+    assert pd.read_parquet(str(tmp_path / "enriched.parquet"))["OutputTitle"].tolist() == ["Trade and Firms", ""]
+    # The scratch checkpoint is removed once the Parquet files are written
+    assert not [path.name for path in tmp_path.iterdir() if "checkpoint" in path.name]
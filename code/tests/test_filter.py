@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from filter_all_csv_files import filter_csv
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({"Proj ID": [5, 18], "Status": ["Completed", "Active"], "Title": ["Exports of plants", "Wages"],
+                  "RDC": ["Boston", "Triangle"], "Start Year": [2001, 2006], "End Year": [2004, 2008], "PI": ["Jane Doe", "John Smith"],
+                  "Abstract": ["Firms and exports of plants", "Wages of workers"]}).to_excel("ProjectsAllMetadata.xlsx", sheet_name="All Metadata", index=False)
+    return tmp_path
+
+
+def enriched(**columns):
+    return pd.DataFrame({"OutputTitle": ["Exports of US plants", "Wages and workers"], "OutputVenue": ["Journal A", "Journal B"], **columns})
+
+
+def test_legacy_authors_column(workdir):
+    enriched(Authors=["['Jane Doe']", "['J. Smith', 'Ann Lee']"]).to_csv("enriched.csv", index=False)
+    filter_csv("enriched.csv", "outputs.csv")
+
+    outputs = pd.read_csv("outputs.csv")
+    assert outputs["ProjID"].tolist() == [5, 18]
+    assert outputs["OutputID"].tolist() == [0, 1]
+    assert pd.read_csv("outputs_Authors.csv")["Author"].tolist() == ["Jane Doe", "J. Smith", "Ann Lee"]
+
+
+def test_output_ids_without_an_author_table(workdir):
+    enriched(OutputID=[7, 9]).to_csv("enriched.csv", index=False)
+    filter_csv("enriched.csv", "outputs.csv")
+    assert pd.read_csv("outputs.csv").empty
+
+
+def test_no_output_ids_and_no_authors(workdir):
+    enriched().to_csv("enriched.csv", index=False)
+    filter_csv("enriched.csv", "outputs.csv")
+    assert pd.read_csv("outputs.csv").empty
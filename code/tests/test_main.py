@@ -0,0 +1,53 @@
+import pytest
+
+import main
+import pipeline
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """
+    Runs main() without running the pipeline, keeping the stages it would have run
+    """
+    built = {}
+
+    def run_pipeline(stages, **kwargs):
+        built.update({stage.name: stage for stage in stages})
+        return {}
+
+    monkeypatch.setattr(pipeline, "run_pipeline", run_pipeline)
+    return built
+
+
+def test_enrich_flags_reach_enrich_csv(stages, monkeypatch):
+    import enrich_all_csv_files
+
+    calls = []
+    monkeypatch.setattr(enrich_all_csv_files, "enrich_csv", lambda df, output_file, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(main, "unique_group_chunks", lambda files, index: iter(()))
+    monkeypatch.setattr(main, "group_fingerprint", lambda: "fingerprint")
+
+    main.main(["--stage", "enrich", "--concurrency", "8", "--checkpoint", "--hedge-delay", "0.5"])
+    stages["enrich"].func()
+    assert calls[0]["concurrency"] == 8
+    assert calls[0]["checkpoint"] is True
+    assert calls[0]["hedge_delay"] == 0.5
+
+
+def test_enrich_defaults(stages):
+    main.main([])
+    assert stages["enrich"].func.keywords == {"concurrency": None, "checkpoint": False, "hedge_delay": None}
+
+
+@pytest.mark.parametrize("flags", [["--concurrency", "0"], ["--hedge-delay", "-1"]])
+def test_bad_enrich_flags_are_rejected(stages, flags):
+    with pytest.raises(SystemExit):
+        main.main(flags)
+    assert not stages
+
+
+@pytest.mark.parametrize("flags, redraw", [([], False), (["--force", "visualize"], True), (["--force", "all"], True),
+                                           (["--force", "filter"], False)])
+def test_force_reaches_render_graphs(stages, flags, redraw):
+    main.main(flags)
+    assert stages["visualize"].func.keywords == {"force": redraw}
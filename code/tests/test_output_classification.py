@@ -0,0 +1,88 @@
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+
+from output_classification import (TYPE_KEYWORDS, classify_output_statuses, classify_output_types, classify_outputs,
+                                   infer_output_status, infer_output_type)
+
+BIBLIOS = [
+    'Doe, J. (2020). "Trade and Firms". *Journal of Tests*, 1(2), 3. https://doi.org/10.1000/1',
+    'Doe, J. (2020). "Trade and Firms" (arXiv:2101.00001). *arXiv*.',
+    'Doe, J. (n.d.). "Trade and Firms". *SSRN Working Paper Series*.',
+    'Doe, J. (2019). "Trade and Firms". *NBER Working Paper Series*.',
+    'Doe, J. (2019). "Trade and Firms".',
+    'Doe, J. (2019). "A Dissertation on Plants". Thesis.',
+    'A "Conference" talk',
+    "",
+    "   ",
+    None,
+    np.nan,
+    pd.NA,
+    2020,
+]
+VENUES = ["Journal of Tests", "Economics Letters", "arXiv", "Census annual report", "GitHub repository", "Media",
+          "Matematika", "", "  ", None, np.nan, pd.NA, 7.0]
+
+
+def expected_labels(biblios, venues):
+    types, statuses = [], []
+    for biblio, venue in zip(biblios, venues):
+        row = {"OutputBiblio": biblio, "OutputVenue": venue}
+        row["OutputType"] = infer_output_type(row)
+        types.append(row["OutputType"])
+        statuses.append(infer_output_status(row))
+    return types, statuses
+
+
+def assert_same_labels(biblios, venues):
+    biblios, venues = pd.Series(biblios, dtype=object), pd.Series(venues, dtype=object)
+    types, statuses = expected_labels(biblios, venues)
+    column_types = classify_output_types(biblios, venues)
+    assert column_types.tolist() == types
+    assert classify_output_statuses(column_types, biblios, venues).tolist() == statuses
+    assert [labels.tolist() for labels in classify_outputs(biblios, venues)] == [types, statuses]
+
+
+def test_every_biblio_and_venue_pair_matches_row_wise():
+    pairs = list(itertools.product(BIBLIOS, VENUES))
+    assert_same_labels([biblio for biblio, _ in pairs], [venue for _, venue in pairs])
+
+
+def test_keyword_citations_match_row_wise():
+    rng = random.Random(5)
+    keywords = [keyword for keywords in TYPE_KEYWORDS.values() for keyword in keywords]
+    biblios = [f'Doe, J. (2020). "{rng.choice(keywords).title()} {rng.choice(keywords)}". {rng.choice(["*", ""])}{rng.choice(keywords)}'
+               for _ in range(2000)]
+    venues = [rng.choice(keywords + [None, ""]) for _ in range(2000)]
+    assert_same_labels(biblios, venues)
+
+
+def test_typed_columns_match_row_wise():
+    # Columns as pandas reads them: all-missing venues are float, citations may be a string dtype
+    biblios = pd.Series(["Doe, J. (2020). \"A\". *Review of Tests*.", None], dtype="string")
+    venues = pd.Series([np.nan, np.nan])
+    types, statuses = expected_labels(biblios, venues)
+    column_types = classify_output_types(biblios, venues)
+    assert column_types.tolist() == types
+    assert classify_output_statuses(column_types, biblios, venues).tolist() == statuses
+    assert [labels.tolist() for labels in classify_outputs(biblios, venues)] == [types, statuses]
+
+
+def test_empty_batch():
+    for dtype in (object, float, "string"):
+        biblios, venues = pd.Series([], dtype=dtype), pd.Series([], dtype=dtype)
+        types = classify_output_types(biblios, venues)
+        assert types.empty
+        assert classify_output_statuses(types, biblios, venues).empty
+        assert all(labels.empty for labels in classify_outputs(biblios, venues))
+
+
+def test_enrich_with_no_rows_writes_an_empty_table(tmp_path):
+    from enrich_all_csv_files import enrich_csv
+
+    output = str(tmp_path / "enriched.csv")
+    enriched = enrich_csv(iter([]), output, cache_path=None, title_index_path=None)
+    assert enriched.empty
+    assert pd.read_csv(output).empty
@@ -0,0 +1,65 @@
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parallel_analyses import attach_frame, run_analysis, share_frame
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Year": np.array([2001, 2002, 2003], dtype=np.int64),
+        "Month": [5.0, np.nan, 7.0],
+        "Count": pd.array([1, None, 3], dtype="Int64"),
+        "Share": pd.array([0.5, None, np.nan], dtype="Float64"),
+        "Flag": pd.array([True, None, False], dtype="boolean"),
+        "Title": ["A", None, "Ç"],
+    }, index=[10, 11, 12])
+
+
+def shared(df, columns=None):
+    shm, spec = share_frame(df)
+    try:
+        attached_shm, attached = attach_frame(spec, columns)
+        # Arrow columns share their buffers even through copy(), so take a copy that owns its memory
+        copy = pickle.loads(pickle.dumps(attached))
+        del attached
+        attached_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+    return copy
+
+
+def test_nullable_numbers_keep_their_dtype(frame):
+    attached = shared(frame)
+    pd.testing.assert_frame_equal(attached.drop(columns="Title"), frame.drop(columns="Title"))
+    assert attached["Title"].tolist() == ["A", None, "Ç"]
+
+
+def test_pyarrow_numbers_keep_their_dtype():
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"Count": pd.array([1, None, 3], dtype="int64[pyarrow]")})
+    pd.testing.assert_frame_equal(shared(df), df)
+
+
+def test_only_the_requested_columns_are_attached(frame):
+    attached = shared(frame, ["Title", "Count", "Missing"])
+    assert list(attached.columns) == ["Count", "Title"]
+    pd.testing.assert_series_equal(attached["Count"], frame["Count"])
+
+
+def test_analysis_gets_the_columns_it_lists(frame, tmp_path, monkeypatch):
+    (tmp_path / "column_probe.py").write_text("COLUMNS = ['Year', 'Flag']\nseen = []\n\ndef main(df):\n    seen.append(df.copy())\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    shm, spec = share_frame(frame)
+    try:
+        elapsed, error = run_analysis("column_probe", spec)
+    finally:
+        shm.close()
+        shm.unlink()
+    assert error is None
+    pd.testing.assert_frame_equal(sys.modules["column_probe"].seen[0], frame[["Year", "Flag"]])
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from author_table import author_table_path, write_author_table
+from normalization import normalize_title
+from title_index import TitleIndex
+
+
+def write_output_table(path):
+    pd.DataFrame({
+        "OutputID": [0, 1],
+        "OutputTitle": ["Trade and Firms in the Census", "Plants, Wages, and Exporters"],
+        "OutputBiblio": ['Bernard, A. B., & Jensen, J. B. (2004). "Trade and Firms in the Census". *Journal of Tests*, 12(3), 45.',
+                         'Doe, J. (2010). "Plants, Wages, and Exporters". *Economics Letters*.'],
+        "OutputVenue": ["Journal of Tests", "Economics Letters"],
+        "OutputYear": ["2004", "2010"],
+        "OutputMonth": ["May", ""],
+        "OutputVolume": ["12", ""],
+        "OutputNumber": ["3", ""],
+        "OutputPages": ["45", ""],
+    }).to_csv(path, index=False)
+
+
+def test_output_table_authors_come_from_its_author_table(tmp_path):
+    table = str(tmp_path / "local.csv")
+    write_output_table(table)
+    # Output 1 is missing from the author table, so its authors come from the citation
+    write_author_table(author_table_path(table), [0], [["Andrew B Bernard", "J Bradford Jensen"]])
+
+    index = TitleIndex(str(tmp_path / "index.sqlite"))
+    assert index.add_output_table(table) == 2
+    first = index.lookup(normalize_title("Trade and Firms in the Census"))
+    second = index.lookup(normalize_title("Plants, Wages, and Exporters"))
+    index.close()
+
+    assert first[:6] == ("Trade and Firms in the Census", ["Andrew B Bernard", "J Bradford Jensen"], "2004", 5, "Journal of Tests", "12")
+    assert first[9] == "Local"
+    assert second[1] == ["J. Doe"]
+
+
+def test_output_table_without_author_table_uses_citations(tmp_path):
+    table = str(tmp_path / "local.csv")
+    write_output_table(table)
+
+    index = TitleIndex(str(tmp_path / "index.sqlite"))
+    index.add_output_table(table)
+    record = index.lookup(normalize_title("Trade and Firms in the Census"))
+    index.close()
+
+    assert record[1] == ["A. B. Bernard", "J. B. Jensen"]
+
+
+def test_unchanged_output_table_is_not_indexed_again(tmp_path):
+    table = str(tmp_path / "local.csv")
+    write_output_table(table)
+
+    index = TitleIndex(str(tmp_path / "index.sqlite"))
+    assert index.add_output_table(table) == 2
+    assert index.add_output_table(table) == 0
+    index.close()
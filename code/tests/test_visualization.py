@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("seaborn")
+
+from visualization import GRAPHS, render_graphs
+
+
+@pytest.fixture
+def outputs(tmp_path):
+    path = tmp_path / "outputs.csv"
+    pd.DataFrame({
+        "ProjectRDC": ["Boston", "Boston", "Chicago"],
+        "OutputYear": ["2019", "2020", "2020"],
+        "OutputBiblio": ['Doe, J. (2019). "A". *Journal*.', 'Lee, A. (2020). "B". *Review*.', 'Doe, J. (2020). "C".'],
+        "OutputType": ["JA", "JA", "WP"],
+        "ProjectTitle": ["Firms", "Firms", "Plants"],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_force_redraws_unchanged_graphs(tmp_path, outputs):
+    out_dir, state_file = str(tmp_path / "Graphs"), str(tmp_path / "state.json")
+    assert sorted(render_graphs(outputs, out_dir, max_workers=1, state_file=state_file)) == sorted(GRAPHS)
+    assert render_graphs(outputs, out_dir, max_workers=1, state_file=state_file) == []
+    assert sorted(render_graphs(outputs, out_dir, max_workers=1, state_file=state_file, force=True)) == sorted(GRAPHS)